@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Brainfuck interpreter.
+
+Runs each shipped .bf program on a representative input through every
+backend in bf.BACKENDS and reports wall time per run, Brainfuck steps per
+second and peak memory. Results can be written as JSON and compared with
+a run from another commit.
+
+Usage:
+    python bench_bf.py
+    python bench_bf.py --backend ir --backend python --number 500
+    python bench_bf.py --json before.json
+    python bench_bf.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import bf
+
+BF_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Program and input, in the same form the whenwords tests use: decimal
+# numbers separated by NUL characters
+PROGRAMS = [
+    ('timeago.bf', '1704049200\x001704067200'),
+    ('duration.bf', '93661'),
+    ('parse_duration.bf', '2h30m'),
+    ('human_date.bf', '1705190400\x001705276800'),
+    ('date_range.bf', '1705276800\x001705881600'),
+]
+
+
+def count_steps(code, input_data):
+    """Brainfuck instructions executed by one run (the same on every backend)."""
+    profile = bf.Profile()
+    bf.interpret(code, input_data, max_steps=None, profile=profile)
+    return profile.steps
+
+
+def peak_memory(code, input_data, backend):
+    """Peak bytes allocated during one run, after compilation is cached."""
+    bf.interpret(code, input_data, backend=backend)
+    tracemalloc.start()
+    try:
+        bf.interpret(code, input_data, backend=backend)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench(code, input_data, backend, number, repeat):
+    """Best wall time per run in seconds."""
+    def run():
+        bf.interpret(code, input_data, backend=backend)
+    run()  # warm the compile caches
+    return min(timeit.repeat(run, number=number, repeat=repeat)) / number
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BF_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=bf.BACKENDS,
+                        help="backend to run (repeatable; default: all)")
+    parser.add_argument("--number", type=int, default=200, help="runs per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats (best is kept)")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="JSON from an earlier run to compare wall times against")
+    args = parser.parse_args()
+    backends = args.backend or list(bf.BACKENDS)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            for row in json.load(f)['results']:
+                baseline[row['program'], row['backend']] = row['seconds_per_run']
+
+    results = []
+    header = f"{'program':<18} {'backend':<10} {'steps':>7} {'us/run':>10} {'steps/s':>12} {'peak KB':>9}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for name, input_data in PROGRAMS:
+        with open(os.path.join(BF_DIR, name), encoding='latin-1') as f:
+            code = f.read()
+        steps = count_steps(code, input_data)
+        for backend in backends:
+            seconds = bench(code, input_data, backend, args.number, args.repeat)
+            peak = peak_memory(code, input_data, backend)
+            row = {
+                'program': name,
+                'backend': backend,
+                'input': input_data,
+                'steps': steps,
+                'seconds_per_run': seconds,
+                'steps_per_second': steps / seconds,
+                'peak_bytes': peak,
+            }
+            results.append(row)
+            line = (f"{name:<18} {backend:<10} {steps:>7} {seconds * 1e6:>10.1f} "
+                    f"{steps / seconds:>12,.0f} {peak / 1024:>9.1f}")
+            if (name, backend) in baseline:
+                line += f" {baseline[name, backend] / seconds:>7.2f}x"
+            print(line)
+
+    if args.json:
+        report = {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'implementation': sys.implementation.name,
+            'number': args.number,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == "__main__":
+    main()
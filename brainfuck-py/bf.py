@@ -2,10 +2,397 @@
 """
 Brainfuck interpreter for whenwords implementation.
 Supports extended cell size (32-bit integers) for timestamp arithmetic.
+
+Source is compiled to a small IR before execution: runs of +/- and </>
+are folded into single ADD/MOVE instructions, clear loops ([-] and [+])
+become SET 0, balanced transfer loops such as [->+<] or [-<++++++++++>]
+become a single MULADD, and bracket jumps are resolved ahead of time.
+Loops that can never run are dropped, and when every loop is balanced the
+tape holds exactly the cells the program can reach (see analyze()).
+Step limits are still counted in original Brainfuck instructions.
+
+The tape is an unsigned array just wide enough for the cell size, so an
+interpreter costs a few bytes per cell rather than a pointer per cell.
+What happens when the pointer leaves the tape is set by a bounds policy:
+wrap around (the default), grow the tape, or raise an error.
+
+Input and output are strings by default; interpret_stream() instead reads
+and writes bytes on binary file objects as the program runs.
 """
+import functools
+import hashlib
+import marshal
+import math
+import os
 import sys
+import time
+from array import array
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CELL_BITS = 32
+DEFAULT_TAPE_SIZE = 30000
+DEFAULT_MAX_STEPS = 100000000
+
+# IR opcodes. Every instruction is a tuple (op, arg, cost) where cost is
+# the number of original instructions it stands for.
+ADD = 0     # arg: delta added to the current cell
+MOVE = 1    # arg: pointer offset
+SET = 2     # clear loop [-] or [+]; arg: the loop's step (+1 or -1), cost: the '['
+OUT = 3     # arg: number of times the current cell is written
+IN = 4      # arg: number of input characters consumed
+JZ = 5      # arg: pc just past the matching JNZ
+JNZ = 6     # arg: pc just past the matching JZ
+MULADD = 7  # arg: (step, iteration cost, ((offset, factor), ...), reach); cost: the '['
+
+BF_COMMANDS = '><+-.,[]'
+
+# Unsigned array types, narrowest first, for tapes
+_TAPE_TYPECODES = 'BHILQ'
+
+# How a program can run; see interpret()
+BACKENDS = ('ir', 'python', 'reference')
+
+# What happens when the pointer leaves the tape
+BOUNDS_POLICIES = ('wrap', 'grow', 'error')
+
+# Cells allocated up front under the "grow" policy
+GROW_INITIAL_SIZE = 256
+
+# How often a Machine with a wall-clock budget checks the time, in steps
+TIME_SLICE_STEPS = 100000
+
+# One-byte strings written by '.' when streaming
+_BYTES = [bytes((i,)) for i in range(256)]
+
+
+def filter_code(code):
+    """Strip everything but the eight Brainfuck commands."""
+    return ''.join(c for c in code if c in BF_COMMANDS)
+
+
+def _match_muladd(code, start, exact_moves=False):
+    """
+    Recognize a balanced move/multiply loop opening at code[start].
+
+    The loop body may only contain +-<>, must return the pointer to where it
+    started and must change that cell by exactly +1 or -1 per iteration.
+    Every iteration then adds a fixed amount to a fixed set of other cells,
+    so the whole loop is equivalent to a single multiply-add. With
+    exact_moves, a body that moves the pointer past the cells it changes is
+    not matched, since checking the targets would not check every cell the
+    pointer visits.
+
+    reach is (lowest offset, steps): steps[o - lowest] is how many steps of
+    the first iteration, counting the '[', run until the pointer first
+    reaches offset o. It tells where a body leaving the tape would stop.
+
+    Returns:
+        (step, body length, ((offset, factor), ...), reach) or None
+    """
+    offset = 0
+    deltas = {}
+    first = {0: 0}
+    j = start + 1
+    while j < len(code) and code[j] in '+-<>':
+        c = code[j]
+        if c in '<>':
+            offset += 1 if c == '>' else -1
+            first.setdefault(offset, j - start + 1)
+        else:
+            deltas[offset] = deltas.get(offset, 0) + (1 if c == '+' else -1)
+        j += 1
+
+    if j >= len(code) or code[j] != ']' or offset != 0:
+        return None
+    step = deltas.pop(0, 0)
+    if step not in (1, -1):
+        return None
+    targets = tuple((o, d) for o, d in deltas.items() if d)
+    lowest, highest = min(first), max(first)
+    if exact_moves:
+        offsets = [0] + [o for o, _ in targets]
+        if lowest < min(offsets) or highest > max(offsets):
+            return None
+    reach = (lowest, tuple(first[o] for o in range(lowest, highest + 1)))
+    return step, j - start - 1, targets, reach
+
+
+def compile_program(code, tape_size=None, exact_moves=False):
+    """
+    Compile Brainfuck source to IR.
+
+    Args:
+        code: Brainfuck source code (non-command characters are ignored)
+        tape_size: If given, loops spanning the whole tape (whose cells could
+            alias each other) are left unfolded
+        exact_moves: If true, every cell the pointer visits is the target of
+            some instruction: runs of <> are split where they change
+            direction, and loops that move past the cells they change are
+            left unfolded. The "error" bounds policy needs this to report
+            the same moves as the reference interpreter.
+
+    Returns:
+        List of (op, arg, cost) instructions
+
+    Raises:
+        ValueError: If brackets are unmatched
+    """
+    code = filter_code(code)
+    program = []
+    stack = []
+    n = len(code)
+    i = 0
+
+    while i < n:
+        c = code[i]
+        if c in '+-':
+            j = i
+            delta = 0
+            while j < n and code[j] in '+-':
+                delta += 1 if code[j] == '+' else -1
+                j += 1
+            program.append((ADD, delta, j - i))
+            i = j
+        elif c in '><':
+            j = i
+            offset = 0
+            while j < n and code[j] in '><':
+                step = 1 if code[j] == '>' else -1
+                if exact_moves and offset * step < 0:
+                    break
+                offset += step
+                j += 1
+            program.append((MOVE, offset, j - i))
+            i = j
+        elif c in '.,':
+            j = i
+            while j < n and code[j] == c:
+                j += 1
+            program.append((OUT if c == '.' else IN, j - i, j - i))
+            i = j
+        elif c == '[':
+            loop = _match_muladd(code, i, exact_moves)
+            if loop is not None:
+                step, length, targets, reach = loop
+                if not targets and length == 1:
+                    program.append((SET, step, 1))
+                    i += length + 2
+                    continue
+                if tape_size is None or all(abs(o) < tape_size for o, _ in targets):
+                    program.append((MULADD, (step, length + 1, targets, reach), 1))
+                    i += length + 2
+                    continue
+            stack.append(len(program))
+            program.append(None)  # patched when the matching ] is found
+            i += 1
+        else:  # ']'
+            if not stack:
+                raise ValueError("Unmatched ]")
+            j = stack.pop()
+            program[j] = (JZ, len(program) + 1, 1)
+            program.append((JNZ, j + 1, 1))
+            i += 1
+
+    if stack:
+        raise ValueError("Unmatched [")
+
+    return program
+
+
+# ============================================================
+# STATIC ANALYSIS
+# ============================================================
+
+Analysis = namedtuple('Analysis', ['min_offset', 'max_offset', 'unbalanced_loops', 'dead_loops'])
+
+
+def analyze(code, tape_size=None):
+    """
+    Analyze Brainfuck source without running it.
+
+    A loop is balanced if its body leaves the pointer where it found it.
+    When every loop that can run is balanced, the pointer offset at every
+    instruction is known ahead of time, and so is every cell the program
+    can reach. The optimized backends then allocate exactly those cells and
+    drop the bounds check on pointer moves.
+
+    Args:
+        code: Brainfuck source code
+        tape_size: As for compile_program()
+
+    Returns:
+        Analysis(min_offset, max_offset, unbalanced_loops, dead_loops): the
+        lowest and highest cell the pointer can reach relative to where it
+        starts (both None if some loop is unbalanced), and the indices in
+        code of the [ of every unbalanced loop and of every loop that can
+        never run because its cell is known to be zero
+
+    Raises:
+        ValueError: If brackets are unmatched
+    """
+    program = compile_program(code, tape_size)
+    dead = _dead_loops(program)
+    lowest, highest, unbalanced = _footprint(program, set(dead))
+    if unbalanced:
+        lowest = highest = None
+    positions = [i for i, c in enumerate(code) if c in BF_COMMANDS]
+    spans = _ir_spans(program)
+    return Analysis(lowest, highest, [positions[spans[pc][0]] for pc in sorted(unbalanced)],
+                    [positions[spans[pc][0]] for pc in dead])
+
+
+def _dead_loops(program):
+    """
+    Indices of loops in compiled IR that can never run.
+
+    A loop's cell is known to be zero at the start of the program and right
+    after another loop (or a skipped dead one), so a loop there is skipped.
+    """
+    dead = []
+    zero = True
+    pc = 0
+    while pc < len(program):
+        op, arg, _ = program[pc]
+        if zero and op in (JZ, SET, MULADD):
+            dead.append(pc)
+            pc = arg if op == JZ else pc + 1
+            continue
+        zero = op in (JNZ, SET, MULADD)
+        pc += 1
+    return dead
+
+
+def _eliminate_dead_loops(program):
+    """
+    Remove loops that can never run from compiled IR.
+
+    A dead loop still costs its [, which is charged to the instruction
+    after it: that instruction is never a jump target, so it runs exactly
+    as often as the loop would have been reached.
+    """
+    dead = set(_dead_loops(program))
+    if not dead:
+        return program
+    result = []
+    stack = []
+    pending = 0
+    pc = 0
+    while pc < len(program):
+        op, arg, cost = program[pc]
+        if pc in dead:
+            pending += cost
+            pc = arg if op == JZ else pc + 1
+            continue
+        cost += pending
+        pending = 0
+        if op == JZ:
+            stack.append(len(result))
+            result.append((JZ, None, cost))  # patched at the matching JNZ
+        elif op == JNZ:
+            j = stack.pop()
+            result[j] = (JZ, len(result) + 1, result[j][2])
+            result.append((JNZ, j + 1, cost))
+        else:
+            result.append((op, arg, cost))
+        pc += 1
+    if pending:
+        result.append((ADD, 0, pending))
+    return result
+
+
+def _footprint(program, dead=()):
+    """
+    Pointer offsets reached by compiled IR, relative to where it starts.
+
+    Loops starting at the indices in dead are skipped.
+
+    Returns:
+        (lowest offset, highest offset, indices of the JZ of every loop
+        whose body moves the pointer); the offsets only bound the pointer
+        if there are no such loops
+    """
+    offset = lowest = highest = 0
+    starts = []
+    unbalanced = []
+    pc = 0
+    while pc < len(program):
+        op, arg, _ = program[pc]
+        if pc in dead:
+            pc = arg if op == JZ else pc + 1
+            continue
+        if op == MOVE:
+            offset += arg
+            lowest = min(lowest, offset)
+            highest = max(highest, offset)
+        elif op == MULADD:
+            for target, _ in arg[2]:
+                lowest = min(lowest, offset + target)
+                highest = max(highest, offset + target)
+        elif op == JZ:
+            starts.append((pc, offset))
+        elif op == JNZ:
+            start, start_offset = starts.pop()
+            if offset != start_offset:
+                unbalanced.append(start)
+                offset = start_offset
+        pc += 1
+    return lowest, highest, unbalanced
+
+
+# Compiled programs kept in memory by each of the compile caches below;
+# least recently used ones are dropped first
+COMPILE_CACHE_SIZE = 256
+
 
-def interpret(code, input_data="", cell_bits=32, tape_size=30000, max_steps=100000000):
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _filtered(code):
+    """filter_code(), cached so repeat runs of a source skip the scan."""
+    return filter_code(code)
+
+
+def _compile(code, tape_size, bounds):
+    """
+    Compile code for the optimized backends, caching the result.
+
+    Returns:
+        (compile_program() IR without dead loops, its _layout())
+    """
+    return _compile_filtered(_filtered(code), tape_size, bounds)
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_filtered(code, tape_size, bounds):
+    """_compile() of already filtered source."""
+    program = _eliminate_dead_loops(_compile_ir(code, tape_size, bounds))
+    return program, _layout(program, tape_size, bounds)
+
+
+def _layout(program, tape_size, bounds):
+    """
+    Tape to run compiled IR on.
+
+    If analysis bounds the pointer, the tape holds just the cells it can
+    reach and the pointer starts at the lowest offset's cell. Under "wrap"
+    that needs fewer reachable cells than tape_size, so no two of them
+    alias; under "error" the pointer must provably stay on the tape.
+
+    Returns:
+        (cells, starting pointer, whether pointer moves must be checked)
+    """
+    lowest, highest, unbalanced = _footprint(program)
+    if not unbalanced:
+        if bounds == "error":
+            if lowest >= 0 and highest < tape_size:
+                return highest + 1, 0, False
+        elif bounds == "grow" or highest - lowest < tape_size:
+            return highest - lowest + 1, -lowest, False
+    return _initial_size(tape_size, bounds), 0, True
+
+
+def interpret(code, input_data="", cell_bits=DEFAULT_CELL_BITS, tape_size=DEFAULT_TAPE_SIZE,
+              max_steps=DEFAULT_MAX_STEPS, backend="ir", bounds="wrap", profile=None,
+              step_budget=None, time_budget=None):
     """
     Execute Brainfuck code.
 
@@ -13,17 +400,141 @@ def interpret(code, input_data="", cell_bits=32, tape_size=30000, max_steps=1000
         code: Brainfuck source code
         input_data: Input string
         cell_bits: Bits per cell (32 for timestamp arithmetic)
-        tape_size: Number of cells
-        max_steps: Maximum operations before timeout
+        tape_size: Number of cells (ignored by the "grow" policy)
+        max_steps: Maximum operations before timeout (counted in original
+            Brainfuck instructions, so it is independent of optimization);
+            None for no limit
+        backend: "ir" (interpret the optimized IR), "python" (run the IR
+            transpiled to Python source) or "reference" (one character at
+            a time, unoptimized)
+        bounds: What happens when the pointer leaves the tape: "wrap" to the
+            other end, "grow" the tape (starting from GROW_INITIAL_SIZE
+            cells, with no upper limit) or raise an "error"
+        profile: A Profile to fill with execution counts. Profiled runs
+            always use the IR interpreter, and the profile is filled even
+            if the run fails.
+        step_budget, time_budget: Pause after about this many steps or
+            seconds instead of running to completion; see Machine.run().
+            Budgeted runs always use the IR interpreter.
 
     Returns:
-        Output string
+        Output string, or a paused Machine if a budget ran out first
+
+    Raises:
+        ValueError: If brackets are unmatched or the backend or bounds
+            policy is unknown
+        RuntimeError: If max_steps is exceeded or, under the "error"
+            policy, the pointer leaves the tape
+    """
+    if profile is not None:
+        return _run_profiled(code, input_data, cell_bits, tape_size, max_steps, bounds, profile)
+    if step_budget is not None or time_budget is not None:
+        machine = Machine(code, input_data, cell_bits, tape_size, max_steps, bounds)
+        return machine.output if machine.run(step_budget, time_budget) else machine
+    run, _ = _compile_runner(code, cell_bits, tape_size, backend, bounds)
+    return run(input_data, float('inf') if max_steps is None else max_steps)
+
+
+def interpret_many(code, inputs, cell_bits=DEFAULT_CELL_BITS, tape_size=DEFAULT_TAPE_SIZE,
+                   max_steps=DEFAULT_MAX_STEPS, backend="ir", bounds="wrap", max_workers=1,
+                   chunk_size=None):
     """
+    Execute one Brainfuck program over many inputs.
+
+    The program is compiled once and, on the optimized backends, a single
+    tape is reused and zeroed between runs instead of being reallocated.
+
+    Args:
+        code: Brainfuck source code
+        inputs: Iterable of input strings
+        max_workers: Worker processes; 1 (the default) runs in this process
+            and None uses one per CPU
+        chunk_size: Inputs per worker task (defaults to about four tasks
+            per worker)
+        Other arguments are as for interpret()
+
+    Returns:
+        A list with the output for each input, in input order
+
+    Raises:
+        ValueError, RuntimeError: As for interpret(), for the first failing
+            input
+    """
+    inputs = list(inputs)
+    if max_workers != 1 and len(inputs) > 1:
+        max_workers = max_workers or os.cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = math.ceil(len(inputs) / (max_workers * 4))
+        elif chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        outputs = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(interpret_many, code, inputs[start:start + chunk_size],
+                                       cell_bits, tape_size, max_steps, backend, bounds)
+                       for start in range(0, len(inputs), chunk_size)]
+            for future in futures:
+                outputs.extend(future.result())
+        return outputs
+
+    run, size = _compile_runner(code, cell_bits, tape_size, backend, bounds)
+    if max_steps is None:
+        max_steps = float('inf')
+    zero = _new_tape(cell_bits, size)
+    tape = zero[:]
+    outputs = []
+    for input_data in inputs:
+        outputs.append(run(input_data, max_steps, tape))
+        # Also shrinks a tape that grew back to its initial size
+        tape[:] = zero
+    return outputs
+
+
+def interpret_stream(code, reader, writer, cell_bits=DEFAULT_CELL_BITS,
+                     tape_size=DEFAULT_TAPE_SIZE, max_steps=DEFAULT_MAX_STEPS, backend="ir",
+                     bounds="wrap"):
+    """
+    Execute Brainfuck code on byte streams.
+
+    ',' reads the next byte from reader (0 at end of input) and '.' writes
+    the low byte of the cell to writer as the program runs, so unbounded
+    input can be processed in constant memory. Output is flushed whenever
+    the writer's buffer fills and when the program stops, even on error.
+
+    Args:
+        code: Brainfuck source code
+        reader: Binary file object, e.g. sys.stdin.buffer
+        writer: Binary file object, e.g. sys.stdout.buffer
+        Other arguments are as for interpret()
+
+    Raises:
+        ValueError, RuntimeError: As for interpret()
+    """
+    try:
+        run, _ = _compile_runner(code, cell_bits, tape_size, backend, bounds, stream=True)
+        run(reader, float('inf') if max_steps is None else max_steps, None, writer)
+    finally:
+        writer.flush()
+
+
+def interpret_reference(code, input_data="", cell_bits=DEFAULT_CELL_BITS,
+                        tape_size=DEFAULT_TAPE_SIZE, max_steps=DEFAULT_MAX_STEPS,
+                        bounds="wrap", writer=None):
+    """
+    Execute Brainfuck code one source character at a time.
+
+    Unoptimized reference for interpret(); same arguments and results. With
+    a writer, input_data is a binary reader and output goes to writer, as
+    for interpret_stream().
+    """
+    _check_bounds(bounds)
+    if max_steps is None:
+        max_steps = float('inf')
+
     # Filter to only BF commands
-    code = ''.join(c for c in code if c in '><+-.,[]')
+    code = filter_code(code)
 
     # Precompute bracket jumps
-    brackets = {}
+    jumps = [0] * len(code)
     stack = []
     for i, c in enumerate(code):
         if c == '[':
@@ -32,13 +543,13 @@ def interpret(code, input_data="", cell_bits=32, tape_size=30000, max_steps=1000
             if not stack:
                 raise ValueError("Unmatched ]")
             j = stack.pop()
-            brackets[j] = i
-            brackets[i] = j
+            jumps[j] = i
+            jumps[i] = j
     if stack:
         raise ValueError("Unmatched [")
 
     # Execute
-    tape = [0] * tape_size
+    tape = _new_tape(cell_bits, _initial_size(tape_size, bounds))
     cell_max = (1 << cell_bits) - 1
     ptr = 0
     pc = 0
@@ -55,58 +566,860 @@ def interpret(code, input_data="", cell_bits=32, tape_size=30000, max_steps=1000
 
         if cmd == '>':
             ptr += 1
-            if ptr >= tape_size:
-                ptr = 0
+            if ptr >= len(tape):
+                ptr, _ = _fit(tape, ptr, bounds, cell_bits)
         elif cmd == '<':
             ptr -= 1
             if ptr < 0:
-                ptr = tape_size - 1
+                ptr, _ = _fit(tape, ptr, bounds, cell_bits)
         elif cmd == '+':
             tape[ptr] = (tape[ptr] + 1) & cell_max
         elif cmd == '-':
             tape[ptr] = (tape[ptr] - 1) & cell_max
         elif cmd == '.':
-            output.append(chr(tape[ptr] & 0xFF))
+            if writer is None:
+                output.append(chr(tape[ptr] & 0xFF))
+            else:
+                writer.write(_BYTES[tape[ptr] & 0xFF])
         elif cmd == ',':
-            if input_ptr < len(input_data):
-                tape[ptr] = ord(input_data[input_ptr])
+            if writer is not None:
+                c = input_data.read(1)
+                tape[ptr] = c[0] & cell_max if c else 0
+            elif input_ptr < len(input_data):
+                tape[ptr] = ord(input_data[input_ptr]) & cell_max
                 input_ptr += 1
             else:
                 tape[ptr] = 0  # EOF
         elif cmd == '[':
             if tape[ptr] == 0:
-                pc = brackets[pc]
+                pc = jumps[pc]
         elif cmd == ']':
             if tape[ptr] != 0:
-                pc = brackets[pc]
+                pc = jumps[pc]
 
         pc += 1
 
     return ''.join(output)
 
 
-def run_file(filename, input_data=""):
-    """Run a Brainfuck file."""
-    with open(filename, 'r') as f:
-        code = f.read()
-    return interpret(code, input_data)
+def _compile_runner(code, cell_bits, tape_size, backend, bounds, stream=False):
+    """
+    Prepare code to run on one of BACKENDS.
+
+    Every public entry point runs programs through this, so all of them
+    accept the same backends and behave the same way on each.
+
+    Returns:
+        (run, cells): a function run(input_data, max_steps, tape=None,
+        writer=None) -> output string, where tape is an optional zeroed
+        tape of the given number of cells to run on (the reference backend
+        always allocates its own). If stream is true, input_data must be a
+        binary reader and output goes to writer instead.
+    """
+    _check_bounds(bounds)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    if backend == "reference":
+        def run(input_data, max_steps, tape=None, writer=None):
+            return interpret_reference(code, input_data, cell_bits, tape_size, max_steps,
+                                       bounds, writer)
+        return run, _initial_size(tape_size, bounds)
+    if backend == "python":
+        runner = _python_runner(code, cell_bits, tape_size, bounds, stream)
+        if runner is not None:
+            return runner
+    program, layout = _compile(code, tape_size, bounds)
+
+    def run(input_data, max_steps, tape=None, writer=None):
+        return _run_ir(program, input_data, cell_bits, layout, max_steps, bounds, tape, writer)
+    return run, layout[0]
+
+
+def _check_bounds(bounds):
+    if bounds not in BOUNDS_POLICIES:
+        raise ValueError(f"Unknown bounds policy: {bounds}")
+
+
+def _fold_limit(tape_size, bounds):
+    """Tape size that limits MULADD offsets; only a wrapping tape needs one."""
+    return tape_size if bounds == "wrap" else None
+
+
+def _compile_ir(code, tape_size, bounds):
+    """compile_program() with the folding a bounds policy allows."""
+    return compile_program(code, _fold_limit(tape_size, bounds), exact_moves=bounds == "error")
+
+
+def _initial_size(tape_size, bounds):
+    return GROW_INITIAL_SIZE if bounds == "grow" else tape_size
+
+
+def _tape_typecode(cell_bits):
+    """Narrowest unsigned array typecode holding cell_bits, or None if none does."""
+    for typecode in _TAPE_TYPECODES:
+        if cell_bits <= 8 * array(typecode).itemsize:
+            return typecode
+    return None
+
+
+def _new_tape(cell_bits, tape_size):
+    """Zeroed tape; a plain list only for cells wider than 64 bits."""
+    typecode = _tape_typecode(cell_bits)
+    if typecode is None:
+        return [0] * tape_size
+    return array(typecode, bytes(tape_size * array(typecode).itemsize))
+
+
+def _fit(tape, index, bounds, cell_bits):
+    """
+    Bring an index that fell off the tape back onto it.
+
+    Returns:
+        (index, shift): the index on the (possibly grown) tape, and how many
+        cells were inserted in front of the tape; every other position held
+        by the caller must move by shift as well
+
+    Raises:
+        RuntimeError: Under the "error" policy
+    """
+    size = len(tape)
+    if bounds == "wrap":
+        return index % size, 0
+    if bounds == "error":
+        # Pointer moves are single cells, so a folded run first left at an edge
+        raise RuntimeError(f"Pointer moved off the tape to cell {-1 if index < 0 else size}")
+    # "grow": at least double, so repeated growth stays amortized O(1)
+    if index >= size:
+        tape.extend(_new_tape(cell_bits, max(size, index + 1 - size)))
+        return index, 0
+    shift = max(size, -index)
+    tape[:0] = _new_tape(cell_bits, shift)
+    return index + shift, shift
+
+
+def _leave_tape(ptr, size, reach, steps, max_steps):
+    """
+    Raise the error a folded loop body leaving the tape stops with.
+
+    The reference interpreter runs the first iteration one instruction at a
+    time, so it stops at whichever edge the body reaches first, or earlier
+    if max_steps runs out on the way. reach is as for _match_muladd() and
+    steps counts everything run before the loop.
+    """
+    lowest, visits = reach
+    edges = []
+    if ptr + lowest < 0:
+        edges.append((visits[-1 - ptr - lowest], -1))
+    if ptr + lowest + len(visits) - 1 >= size:
+        edges.append((visits[size - ptr - lowest], size))
+    moves, cell = min(edges)
+    if steps + moves > max_steps:
+        raise RuntimeError(f"Execution exceeded {max_steps} steps")
+    raise RuntimeError(f"Pointer moved off the tape to cell {cell}")
+
+
+def _run_ir(program, input_data, cell_bits, layout, max_steps, bounds="wrap", tape=None,
+            writer=None, counters=None, state=None, pause_at=None):
+    """
+    Execute compiled IR, on a new tape unless a zeroed one is given.
+
+    layout is the program's _layout(), which sets the size of a new tape
+    and where the pointer starts.
+
+    With a writer, input_data is a binary reader and output goes to writer.
+    counters, if given, is a list of 2 * len(program) zeros: the first half
+    counts executions of each instruction and the second half the loop
+    iterations folded into each SET and MULADD.
+
+    With a state (a Machine), execution starts from and is saved back to
+    that machine, and pauses at the first instruction boundary where at
+    least pause_at steps have run.
+    """
+    if state is None:
+        if tape is None:
+            tape = _new_tape(cell_bits, layout[0])
+        ptr = layout[1]
+        pc = input_ptr = steps = 0
+        output = []
+    else:
+        tape, ptr, pc = state.tape, state.ptr, state.pc
+        input_ptr, output, steps = state.input_pos, state.chunks, state.steps
+    size = len(tape)
+    cell_max = (1 << cell_bits) - 1
+    n = len(program)
+    # A single comparison per instruction covers both max_steps and pausing
+    limit = max_steps if pause_at is None else min(max_steps, pause_at - 1)
+
+    try:
+        while pc < n:
+            op, arg, cost = program[pc]
+            if counters is not None:
+                counters[pc] += 1
+            pc += 1
+
+            if op == ADD:
+                tape[ptr] = (tape[ptr] + arg) & cell_max
+            elif op == MOVE:
+                ptr += arg
+                if not 0 <= ptr < size:
+                    if bounds == "error":
+                        # The reference counts each move up to the first one off the
+                        # tape, after any dead loop charged to this instruction
+                        moves = size - ptr + arg if arg > 0 else ptr - arg + 1
+                        if steps + cost - abs(arg) + moves > max_steps:
+                            raise RuntimeError(f"Execution exceeded {max_steps} steps")
+                    ptr, _ = _fit(tape, ptr, bounds, cell_bits)
+                    size = len(tape)
+            elif op == SET:
+                # [ plus two instructions per iteration until the cell wraps to 0
+                count = (-arg * tape[ptr]) & cell_max
+                cost += 2 * count
+                tape[ptr] = 0
+                if counters is not None:
+                    counters[n + pc - 1] += count
+            elif op == MULADD:
+                value = tape[ptr]
+                if value:
+                    step, iteration_cost, targets, reach = arg
+                    if bounds == "error":
+                        lowest, visits = reach
+                        if not 0 <= ptr + lowest <= ptr + lowest + len(visits) - 1 < size:
+                            _leave_tape(ptr, size, reach, steps + cost - 1, max_steps)
+                    count = (-step * value) & cell_max
+                    for offset, factor in targets:
+                        i = ptr + offset
+                        if not 0 <= i < size:
+                            i, shift = _fit(tape, i, bounds, cell_bits)
+                            ptr += shift
+                            size = len(tape)
+                        tape[i] = (tape[i] + count * factor) & cell_max
+                    tape[ptr] = 0
+                    cost += count * iteration_cost
+                    if counters is not None:
+                        counters[n + pc - 1] += count
+            elif op == JZ:
+                if tape[ptr] == 0:
+                    pc = arg
+            elif op == JNZ:
+                if tape[ptr] != 0:
+                    pc = arg
+            elif op == OUT:
+                if writer is None:
+                    output.append(chr(tape[ptr] & 0xFF) * arg)
+                else:
+                    writer.write(_BYTES[tape[ptr] & 0xFF] * arg)
+            elif writer is None:  # IN
+                input_ptr += arg
+                if input_ptr <= len(input_data):
+                    tape[ptr] = ord(input_data[input_ptr - 1]) & cell_max
+                else:
+                    tape[ptr] = 0  # EOF
+            else:  # IN from a stream
+                chunk = input_data.read(arg)
+                tape[ptr] = chunk[-1] & cell_max if len(chunk) == arg else 0
+
+            steps += cost
+            if steps > limit:
+                if steps > max_steps:
+                    raise RuntimeError(f"Execution exceeded {max_steps} steps")
+                break
+    finally:
+        if state is not None:
+            state.ptr, state.pc, state.input_pos, state.steps = ptr, pc, input_ptr, steps
+            state.finished = pc >= n
+
+    return ''.join(output)
+
+
+class Machine:
+    """
+    Resumable execution of a Brainfuck program on the IR interpreter.
+
+    A machine runs in slices with run() and keeps its complete state in
+    between, so long jobs can be paused, pickled and continued later.
+
+    Attributes:
+        pc: Index of the next IR instruction
+        ptr: Data pointer
+        tape: The tape (an array, see _new_tape)
+        input_pos: Number of input characters consumed
+        steps: Instructions executed so far, in original Brainfuck instructions
+        finished: Whether the program has run to completion
+    """
+
+    def __init__(self, code, input_data="", cell_bits=DEFAULT_CELL_BITS,
+                 tape_size=DEFAULT_TAPE_SIZE, max_steps=DEFAULT_MAX_STEPS, bounds="wrap"):
+        """Compile code; arguments are as for interpret()."""
+        _check_bounds(bounds)
+        self.program, self.layout = _compile(code, tape_size, bounds)
+        self.input_data = input_data
+        self.cell_bits = cell_bits
+        self.max_steps = float('inf') if max_steps is None else max_steps
+        self.bounds = bounds
+        self.tape = _new_tape(cell_bits, self.layout[0])
+        self.ptr = self.layout[1]
+        self.pc = self.input_pos = self.steps = 0
+        self.chunks = []
+        self.finished = not self.program
+
+    @property
+    def output(self):
+        """Output produced so far."""
+        return ''.join(self.chunks)
+
+    def run(self, steps=None, seconds=None):
+        """
+        Continue until the program ends or a budget runs out.
+
+        Budgets are checked between instructions, so a folded loop may run
+        past them; the time is checked every TIME_SLICE_STEPS steps.
+
+        Args:
+            steps: Pause once at least this many more steps have run
+            seconds: Pause once this much wall-clock time has passed
+
+        Returns:
+            True if the program has finished, False if it paused
+
+        Raises:
+            RuntimeError: If max_steps is exceeded, or the pointer leaves
+                the tape under the "error" bounds policy
+        """
+        stop = math.inf if steps is None else self.steps + steps
+        deadline = None if seconds is None else time.monotonic() + seconds
+        while not self.finished:
+            if self.steps >= stop or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            pause_at = stop if deadline is None else min(stop, self.steps + TIME_SLICE_STEPS)
+            _run_ir(self.program, self.input_data, self.cell_bits, self.layout,
+                    self.max_steps, self.bounds, state=self, pause_at=pause_at)
+        return True
+
+
+# ============================================================
+# PROFILING
+# ============================================================
+
+LoopProfile = namedtuple('LoopProfile', [
+    'line', 'column', 'end_line', 'end_column', 'entries', 'iterations', 'steps'])
+
+
+class Profile:
+    """
+    Execution counts collected by interpret(..., profile=Profile()).
+
+    Attributes:
+        source: The profiled source code
+        counts: How many times each character of source was executed (0 for
+            comments), so counts are in original Brainfuck instructions
+    """
+
+    def __init__(self):
+        self.source = ''
+        self.counts = []
+
+    @property
+    def steps(self):
+        """Total instructions executed."""
+        return sum(self.counts)
+
+    def position(self, index):
+        """1-based (line, column) of an index into source."""
+        line_start = self.source.rfind('\n', 0, index) + 1
+        return self.source.count('\n', 0, index) + 1, index - line_start + 1
+
+    def loops(self):
+        """
+        Statistics for every loop, hottest first.
+
+        Returns:
+            List of LoopProfile: where the loop's [ and ] are, how many
+            times it was entered, how many iterations its body ran in total
+            and how many instructions were executed inside it, brackets and
+            nested loops included
+        """
+        prefix = [0]
+        for count in self.counts:
+            prefix.append(prefix[-1] + count)
+        loops = []
+        stack = []
+        for i, c in enumerate(self.source):
+            if c == '[':
+                stack.append(i)
+            elif c == ']':
+                start = stack.pop()
+                loops.append(LoopProfile(*self.position(start), *self.position(i),
+                                         entries=self.counts[start],
+                                         iterations=self.counts[i],
+                                         steps=prefix[i + 1] - prefix[start]))
+        loops.sort(key=lambda loop: loop.steps, reverse=True)
+        return loops
+
+    def report(self, limit=10, filename="<bf>"):
+        """
+        Text table of the hottest loops.
+
+        Args:
+            limit: Maximum number of loops to list
+            filename: Name to print in front of each line:column location
+        """
+        total = self.steps
+        lines = [f"{total} steps",
+                 f"{'steps':>14} {'%':>6} {'entries':>10} {'iterations':>12}  location"]
+        for loop in self.loops()[:limit]:
+            share = 100 * loop.steps / total if total else 0.0
+            lines.append(f"{loop.steps:>14} {share:>5.1f}% {loop.entries:>10} "
+                         f"{loop.iterations:>12}  {filename}:{loop.line}:{loop.column}"
+                         f"-{loop.end_line}:{loop.end_column}")
+        return '\n'.join(lines) + '\n'
+
+
+def _ir_spans(program):
+    """Start index in filtered code and length of every compile_program() instruction."""
+    spans = []
+    start = 0
+    for op, arg, cost in program:
+        if op == SET:
+            length = 3
+        elif op == MULADD:
+            length = arg[1] + 1   # iteration cost covers the body and ]
+        else:
+            length = cost
+        spans.append((start, length))
+        start += length
+    return spans
+
+
+def _run_profiled(code, input_data, cell_bits, tape_size, max_steps, bounds, profile):
+    """Run on the IR interpreter, filling profile even if the run fails."""
+    _check_bounds(bounds)
+    program = _compile_ir(code, tape_size, bounds)
+    n = len(program)
+    counters = [0] * (2 * n)
+    try:
+        return _run_ir(program, input_data, cell_bits, _layout(program, tape_size, bounds),
+                       float('inf') if max_steps is None else max_steps, bounds,
+                       counters=counters)
+    finally:
+        positions = [i for i, c in enumerate(code) if c in BF_COMMANDS]
+        counts = [0] * len(code)
+        for k, (start, length) in enumerate(_ir_spans(program)):
+            executions, iterations = counters[k], counters[n + k]
+            counts[positions[start]] += executions
+            for j in range(start + 1, start + length):
+                # Loop bodies of SET and MULADD run once per iteration
+                counts[positions[j]] += iterations if program[k][0] in (SET, MULADD) else executions
+        profile.source = code
+        profile.counts = counts
+
+
+# ============================================================
+# PYTHON BACKEND
+# ============================================================
+
+# CPython refuses to compile more than 20 statically nested loops
+MAX_TRANSPILE_DEPTH = 20
+
+
+class _Emitter:
+    """Builds the body of a transpiled program, tracking pointer offsets."""
+
+    def __init__(self, wrap=True, checked=True, error=False):
+        self.wrap = wrap          # tape never changes size, so offsets can be deferred
+        self.checked = checked    # False if analysis proved the pointer stays on the tape
+        self.error = error        # leaving the tape raises, so step limits are checked first
+        self.lines = []
+        self.depth = 1
+        self.offset = 0    # pending pointer movement not yet applied to p
+        self.pending = 0   # static step cost not yet added to steps
+
+    def emit(self, line):
+        self.lines.append('    ' * self.depth + line)
+
+    def cell(self, extra=0):
+        """Expression for the tape index at the current offset."""
+        offset = self.offset + extra
+        if offset == 0:
+            return 'p'
+        if not self.checked:
+            return f'p + {offset}' if offset > 0 else f'p - {-offset}'
+        return f'(p + {offset}) % T'
+
+    def flush_pointer(self):
+        if not self.offset:
+            return
+        if not self.checked:
+            self.emit(f'p += {self.offset}')
+        elif self.wrap:
+            self.emit(f'p = (p + {self.offset}) % T')
+        else:
+            self.emit(f'p += {self.offset}')
+            self.emit('if not 0 <= p < len(tape):')
+            if self.error:
+                # Moves of the run up to the first cell off the tape
+                if self.offset > 0:
+                    moves = f'len(tape) - p + {self.offset}'
+                else:
+                    moves = f'p + {1 - self.offset}'
+                self.check_steps(f'{self.pending} + {moves}', indent='    ')
+            self.emit('    p, _ = _fit(tape, p, B, C)')
+        self.offset = 0
+
+    def target(self, extra):
+        """Set y to the tape index extra cells from the current one."""
+        if self.wrap or not self.checked or self.error:
+            self.emit(f'y = {self.cell(extra)}')
+        else:
+            self.emit(f'y = p + {extra}')
+            self.emit('if not 0 <= y < len(tape):')
+            self.emit('    y, shift = _fit(tape, y, B, C)')
+            self.emit('    p += shift')
+
+    def flush_steps(self, extra=0):
+        if self.pending + extra:
+            self.emit(f'steps += {self.pending + extra}')
+            self.pending = 0
+
+    def check_steps(self, extra=0, indent=''):
+        """Raise once steps, plus extra steps not yet counted, exceed max_steps."""
+        self.emit(f'{indent}if steps > max_steps:' if not extra
+                  else f'{indent}if steps + {extra} > max_steps:')
+        self.emit(f'{indent}    raise RuntimeError(f"Execution exceeded {{max_steps}} steps")')
+
+
+def transpile(code, cell_bits=DEFAULT_CELL_BITS, tape_size=DEFAULT_TAPE_SIZE, bounds="wrap"):
+    """
+    Translate Brainfuck source into Python source.
+
+    The optimized IR becomes a function run(input_data, max_steps, tape=None)
+    made of nested "while tape[p]:" blocks. Pointer moves inside
+    straight-line code become constant offsets, and steps are charged in
+    original instructions and checked once per loop iteration and at the
+    end. Under the "grow" and "error" bounds policies every move is applied
+    and checked immediately, unless analyze() proves the pointer stays on
+    the tape; then offsets are used without any bounds check or wrap.
+
+    Returns:
+        Python source code
+
+    Raises:
+        ValueError: If brackets are unmatched or loops nest deeper than
+            MAX_TRANSPILE_DEPTH
+    """
+    _check_bounds(bounds)
+    program, _ = _compile(code, tape_size, bounds)
+    if _loop_depth(program) > MAX_TRANSPILE_DEPTH:
+        raise ValueError("Loops nested too deeply to transpile")
+    return _transpile_program(program, cell_bits, tape_size, bounds)
+
+
+def _loop_depth(program):
+    """Deepest loop nesting in compiled IR."""
+    depth = deepest = 0
+    for op, _, _ in program:
+        if op == JZ:
+            depth += 1
+            deepest = max(deepest, depth)
+        elif op == JNZ:
+            depth -= 1
+    return deepest
+
+
+def _transpile_program(program, cell_bits, tape_size, bounds="wrap", stream=False):
+    """Python source for compiled IR; see transpile() and interpret_stream()."""
+    size, origin, checked = _layout(program, tape_size, bounds)
+    out = _Emitter(wrap=bounds == "wrap", checked=checked, error=bounds == "error")
+    typecode = _tape_typecode(cell_bits)
+    out.emit('if tape is None:')
+    if typecode is None:
+        out.emit('    tape = [0] * S')
+    else:
+        out.emit(f'    tape = array({typecode!r}, bytes(S * {array(typecode).itemsize}))')
+    out.emit(f'p = {origin}')
+    if stream:
+        out.emit('read = input_data.read')
+        out.emit('write = writer.write')
+    else:
+        out.emit('ip = 0')
+        out.emit('n_in = len(input_data)')
+        out.emit('output = []')
+        out.emit('append = output.append')
+    out.emit('steps = 0')
+
+    for op, arg, cost in program:
+        if op == MOVE:
+            # Checked moves are applied at once, counting only the steps
+            # before the moves themselves (a dead loop charged to them)
+            out.offset += arg
+            out.pending += cost - abs(arg)
+            if out.checked and not out.wrap:
+                out.flush_pointer()
+            out.pending += abs(arg)
+            continue
+        if op == JZ:
+            out.flush_pointer()
+            out.flush_steps(cost)
+            out.emit('while tape[p]:')
+            out.depth += 1
+            continue
+        if op == JNZ:
+            out.flush_pointer()
+            out.flush_steps(cost)
+            out.check_steps()
+            out.depth -= 1
+            continue
+
+        if out.offset:
+            out.emit(f'x = {out.cell()}')
+            x = 'x'
+        else:
+            x = 'p'
+        if op == ADD:
+            if arg:
+                out.emit(f'tape[{x}] = (tape[{x}] + {arg}) & M')
+        elif op == SET:
+            count = f'tape[{x}]' if arg < 0 else f'-tape[{x}] & M'
+            out.emit(f'if tape[{x}]:')
+            out.emit(f'    steps += 2 * ({count})')
+            out.emit(f'    tape[{x}] = 0')
+        elif op == MULADD:
+            step, iteration_cost, targets, reach = arg
+            out.emit(f'v = tape[{x}]')
+            out.emit('if v:')
+            if out.error and out.checked:
+                lowest, visits = reach
+                left = f'p - {-lowest}' if lowest else 'p'
+                out.emit(f'    if {left} < 0 or p + {lowest + len(visits) - 1} >= len(tape):')
+                out.emit(f'        _leave_tape(p, len(tape), {reach!r}, steps + {out.pending + cost - 1}, max_steps)')
+            if step > 0:
+                out.emit('    v = -v & M')
+            for offset, factor in targets:
+                term = 'v' if factor == 1 else f'v * {factor}'
+                out.depth += 1
+                out.target(offset)
+                out.depth -= 1
+                out.emit(f'    tape[y] = (tape[y] + {term}) & M')
+            out.emit(f'    tape[{x}] = 0')
+            out.emit(f'    steps += v * {iteration_cost}')
+        elif op == OUT:
+            if stream:
+                char, put = f'_BYTES[tape[{x}] & 255]', 'write'
+            else:
+                char, put = f'chr(tape[{x}] & 255)', 'append'
+            out.emit(f'{put}({char})' if arg == 1 else f'{put}({char} * {arg})')
+        elif stream:  # IN
+            out.emit(f'c = read({arg})')
+            out.emit(f'tape[{x}] = c[-1] & M if len(c) == {arg} else 0')
+        else:  # IN
+            out.emit(f'ip += {arg}')
+            out.emit(f'tape[{x}] = ord(input_data[ip - 1]) & M if ip <= n_in else 0')
+        out.pending += cost
+
+    out.flush_steps()
+    out.check_steps()
+    out.emit("return ''" if stream else "return ''.join(output)")
+
+    header = [
+        'from array import array',
+        '',
+        f'T = {tape_size}',
+        f'M = {(1 << cell_bits) - 1}',
+        f'B = {bounds!r}',
+        f'C = {cell_bits}',
+        f'S = {size}',
+        '',
+        'def run(input_data, max_steps, tape=None, writer=None):',
+    ]
+    return '\n'.join(header + out.lines) + '\n'
+
+
+def _python_code(program, cell_bits, tape_size, bounds="wrap", stream=False):
+    """Compile IR to a Python code object, or None if nested too deeply."""
+    if _loop_depth(program) > MAX_TRANSPILE_DEPTH:
+        return None
+    source = _transpile_program(program, cell_bits, tape_size, bounds, stream)
+    return compile(source, '<brainfuck>', 'exec')
+
+
+def _load_python(code_object):
+    """Return the run() function defined by a transpiled code object and its tape size."""
+    namespace = {'_fit': _fit, '_leave_tape': _leave_tape, '_BYTES': _BYTES}
+    exec(code_object, namespace)
+    return namespace['run'], namespace['S']
+
+
+def compile_python(code, cell_bits=DEFAULT_CELL_BITS, tape_size=DEFAULT_TAPE_SIZE,
+                   bounds="wrap", stream=False):
+    """
+    Transpile and compile Brainfuck source, caching the code object.
+
+    Returns:
+        A function run(input_data, max_steps, tape=None, writer=None) ->
+        output string, or None if the program nests loops too deeply for the
+        Python backend. If stream is true, run() reads bytes from input_data
+        (a binary reader) and writes them to writer.
+    """
+    _check_bounds(bounds)
+    runner = _python_runner(code, cell_bits, tape_size, bounds, stream)
+    return None if runner is None else runner[0]
+
+
+def _python_runner(code, cell_bits, tape_size, bounds, stream):
+    """compile_python() for _compile_runner(): (run, tape cells) or None."""
+    code_object = _python_object(_filtered(code), cell_bits, tape_size, bounds, stream)
+    return None if code_object is None else _load_python(code_object)
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _python_object(code, cell_bits, tape_size, bounds, stream):
+    """Code object of already filtered source, or None if nested too deeply."""
+    program, _ = _compile_filtered(code, tape_size, bounds)
+    return _python_code(program, cell_bits, tape_size, bounds, stream)
+
+
+# ============================================================
+# ON-DISK CACHE
+# ============================================================
+
+# Bump whenever the IR or the generated Python changes shape
+CACHE_VERSION = 9
+
+# Directory created next to .bf files, like __pycache__
+CACHE_DIR = '__bfcache__'
+
+# Cache entries already loaded by this process, keyed by cache file path
+_file_cache = {}
+
+
+def cache_path(filename):
+    """Path of the compiled-program cache for a .bf file."""
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIR, f"{name}.{sys.implementation.cache_tag}.bfc")
+
+
+def _load_cache(path, digest):
+    """Return the cache entry for path, or a fresh one if missing or stale."""
+    entry = _file_cache.get(path)
+    if entry is None or entry['digest'] != digest:
+        try:
+            with open(path, 'rb') as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            entry = None
+        if (not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION
+                or entry.get('digest') != digest):
+            entry = {'version': CACHE_VERSION, 'digest': digest, 'ir': {}, 'python': {}}
+        _file_cache[path] = entry
+    return entry
+
+
+def _save_cache(path, entry):
+    """Write a cache entry atomically; failures are ignored like __pycache__ writes."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def run_file(filename, input_data="", backend="ir", cache=True, bounds="wrap", writer=None):
+    """
+    Run a Brainfuck file.
+
+    Unless cache is False, the compiled program (IR, or the transpiled code
+    object for the "python" backend) is stored in a __bfcache__ directory
+    next to the file. Entries are keyed by a SHA-256 of the source and by
+    CACHE_VERSION, so unchanged files skip filtering and compilation.
+    bounds is the tape bounds policy, as for interpret().
+
+    With a writer, the program streams as in interpret_stream(): input_data
+    must be a binary reader, output goes to writer and None is returned.
+    """
+    with open(filename, 'rb') as f:
+        source = f.read()
+    # Commands are ASCII, so any byte-preserving decoding finds the same ones
+    code = source.decode('latin-1')
+    stream = writer is not None
+    if not cache or backend == "reference":
+        if stream:
+            return interpret_stream(code, input_data, writer, backend=backend, bounds=bounds)
+        return interpret(code, input_data, backend=backend, bounds=bounds)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}")
+    _check_bounds(bounds)
+
+    path = cache_path(filename)
+    entry = _load_cache(path, hashlib.sha256(source).hexdigest())
+    changed = False
+
+    program = entry['ir'].get(bounds)
+    if program is None:
+        program = entry['ir'][bounds] = _eliminate_dead_loops(
+            _compile_ir(code, DEFAULT_TAPE_SIZE, bounds))
+        changed = True
+
+    run = None
+    if backend == "python":
+        key = (DEFAULT_CELL_BITS, DEFAULT_TAPE_SIZE, bounds, stream)
+        if key not in entry['python']:
+            entry['python'][key] = _python_code(program, *key)
+            changed = True
+        if entry['python'][key] is not None:
+            run, _ = _load_python(entry['python'][key])
+
+    if changed:
+        _save_cache(path, entry)
+
+    try:
+        if run is not None:
+            output = run(input_data, DEFAULT_MAX_STEPS, None, writer)
+        else:
+            output = _run_ir(program, input_data, DEFAULT_CELL_BITS,
+                             _layout(program, DEFAULT_TAPE_SIZE, bounds), DEFAULT_MAX_STEPS,
+                             bounds, None, writer)
+    finally:
+        if stream:
+            writer.flush()
+    return None if stream else output
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: bf.py <file.bf> [input]")
+    args = sys.argv[1:]
+    profile = Profile() if args[:1] == ["--profile"] else None
+    if profile is not None:
+        args = args[1:]
+    if not args:
+        print("Usage: bf.py [--profile] <file.bf> [input]")
         sys.exit(1)
 
-    filename = sys.argv[1]
-    input_data = sys.argv[2] if len(sys.argv) > 2 else ""
-
-    # Also read from stdin if no input arg and stdin has data
-    if not input_data and not sys.stdin.isatty():
-        input_data = sys.stdin.read()
+    filename = args[0]
 
     try:
-        result = run_file(filename, input_data)
-        print(result, end='')
+        if profile is not None:
+            # Profiled runs print the hottest loops to stderr after the output
+            with open(filename, 'r', encoding='latin-1') as f:
+                code = f.read()
+            if len(args) > 1:
+                input_data = args[1]
+            else:
+                # Only read stdin when it is piped; a terminal means empty input
+                input_data = "" if sys.stdin.isatty() else sys.stdin.read()
+            try:
+                print(interpret(code, input_data, profile=profile), end='')
+            finally:
+                sys.stdout.flush()
+                print(profile.report(filename=filename), end='', file=sys.stderr)
+        elif len(args) > 1:
+            print(run_file(filename, args[1]), end='')
+        elif sys.stdin.isatty():
+            # As above, a terminal means empty input rather than waiting for EOF
+            print(run_file(filename, ""), end='')
+        else:
+            # Stream piped stdin to stdout
+            run_file(filename, sys.stdin.buffer, writer=sys.stdout.buffer)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,8 +2,9 @@
 """
 Test suite for WhenWords Brainfuck implementation.
 
-This test file is generated from tests.yaml and verifies that the
-Brainfuck implementation passes all specification test cases.
+Verifies that the Brainfuck implementation passes all specification test
+cases: TestSpecCorpus runs every case of tests.yaml itself through the
+shared spec_corpus loader, so it cannot drift from the specification.
 
 Usage:
     python test_whenwords.py           # Run all tests
@@ -14,666 +15,597 @@ Usage:
 import sys
 import os
 
-# Add the current directory to path
+# Add the current directory and the repository root (for spec_corpus) to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import whenwords_lib
 from whenwords_lib import timeago, duration, parse_duration, human_date, date_range
+from whenwords_lib import _civil_from_days, bf_interpret
+import bf
+import spec_corpus
+from datetime import date, datetime, timezone
+import random
+import io
+import marshal
+import pickle
+import subprocess
 import pytest
 
 
 # ============================================================
-# TIMEAGO TESTS (from tests.yaml)
+# TESTS.YAML CORPUS
 # ============================================================
 
-class TestTimeago:
-    """Tests for timeago function."""
-
-    def test_just_now_identical_timestamps(self):
-        """just now - identical timestamps"""
-        result = timeago(1704067200, 1704067200)
-        assert result == "just now"
-
-    def test_just_now_30_seconds_ago(self):
-        """just now - 30 seconds ago"""
-        result = timeago(1704067170, 1704067200)
-        assert result == "just now"
-
-    def test_just_now_44_seconds_ago(self):
-        """just now - 44 seconds ago"""
-        result = timeago(1704067156, 1704067200)
-        assert result == "just now"
-
-    def test_1_minute_ago_45_seconds(self):
-        """1 minute ago - 45 seconds"""
-        result = timeago(1704067155, 1704067200)
-        assert result == "1 minute ago"
-
-    def test_1_minute_ago_89_seconds(self):
-        """1 minute ago - 89 seconds"""
-        result = timeago(1704067111, 1704067200)
-        assert result == "1 minute ago"
-
-    def test_2_minutes_ago_90_seconds(self):
-        """2 minutes ago - 90 seconds"""
-        result = timeago(1704067110, 1704067200)
-        assert result == "2 minutes ago"
-
-    def test_30_minutes_ago(self):
-        """30 minutes ago"""
-        result = timeago(1704065400, 1704067200)
-        assert result == "30 minutes ago"
-
-    def test_44_minutes_ago(self):
-        """44 minutes ago"""
-        result = timeago(1704064560, 1704067200)
-        assert result == "44 minutes ago"
-
-    def test_1_hour_ago_45_minutes(self):
-        """1 hour ago - 45 minutes"""
-        result = timeago(1704064500, 1704067200)
-        assert result == "1 hour ago"
-
-    def test_1_hour_ago_89_minutes(self):
-        """1 hour ago - 89 minutes"""
-        result = timeago(1704061860, 1704067200)
-        assert result == "1 hour ago"
-
-    def test_2_hours_ago_90_minutes(self):
-        """2 hours ago - 90 minutes"""
-        result = timeago(1704061800, 1704067200)
-        assert result == "2 hours ago"
-
-    def test_5_hours_ago(self):
-        """5 hours ago"""
-        result = timeago(1704049200, 1704067200)
-        assert result == "5 hours ago"
-
-    def test_21_hours_ago(self):
-        """21 hours ago"""
-        result = timeago(1703991600, 1704067200)
-        assert result == "21 hours ago"
-
-    def test_1_day_ago_22_hours(self):
-        """1 day ago - 22 hours"""
-        result = timeago(1703988000, 1704067200)
-        assert result == "1 day ago"
-
-    def test_1_day_ago_35_hours(self):
-        """1 day ago - 35 hours"""
-        result = timeago(1703941200, 1704067200)
-        assert result == "1 day ago"
-
-    def test_2_days_ago_36_hours(self):
-        """2 days ago - 36 hours"""
-        result = timeago(1703937600, 1704067200)
-        assert result == "2 days ago"
-
-    def test_7_days_ago(self):
-        """7 days ago"""
-        result = timeago(1703462400, 1704067200)
-        assert result == "7 days ago"
-
-    def test_25_days_ago(self):
-        """25 days ago"""
-        result = timeago(1701907200, 1704067200)
-        assert result == "25 days ago"
-
-    def test_1_month_ago_26_days(self):
-        """1 month ago - 26 days"""
-        result = timeago(1701820800, 1704067200)
-        assert result == "1 month ago"
-
-    def test_1_month_ago_45_days(self):
-        """1 month ago - 45 days"""
-        result = timeago(1700179200, 1704067200)
-        assert result == "1 month ago"
-
-    def test_2_months_ago_46_days(self):
-        """2 months ago - 46 days"""
-        result = timeago(1700092800, 1704067200)
-        assert result == "2 months ago"
-
-    def test_6_months_ago(self):
-        """6 months ago"""
-        result = timeago(1688169600, 1704067200)
-        assert result == "6 months ago"
-
-    def test_10_months_ago_319_days(self):
-        """10 months ago - 319 days"""
-        result = timeago(1676505600, 1704067200)
-        assert result == "10 months ago"
-
-    def test_1_year_ago_320_days(self):
-        """1 year ago - 320 days"""
-        result = timeago(1676419200, 1704067200)
-        assert result == "1 year ago"
-
-    def test_1_year_ago_547_days(self):
-        """1 year ago - 547 days"""
-        result = timeago(1656806400, 1704067200)
-        assert result == "1 year ago"
-
-    def test_2_years_ago_548_days(self):
-        """2 years ago - 548 days"""
-        result = timeago(1656720000, 1704067200)
-        assert result == "2 years ago"
-
-    def test_5_years_ago(self):
-        """5 years ago"""
-        result = timeago(1546300800, 1704067200)
-        assert result == "5 years ago"
-
-    def test_future_in_just_now_30_seconds(self):
-        """future - in just now (30 seconds)"""
-        result = timeago(1704067230, 1704067200)
-        assert result == "just now"
-
-    def test_future_in_1_minute(self):
-        """future - in 1 minute"""
-        result = timeago(1704067260, 1704067200)
-        assert result == "in 1 minute"
-
-    def test_future_in_5_minutes(self):
-        """future - in 5 minutes"""
-        result = timeago(1704067500, 1704067200)
-        assert result == "in 5 minutes"
-
-    def test_future_in_1_hour(self):
-        """future - in 1 hour"""
-        result = timeago(1704070200, 1704067200)
-        assert result == "in 1 hour"
-
-    def test_future_in_3_hours(self):
-        """future - in 3 hours"""
-        result = timeago(1704078000, 1704067200)
-        assert result == "in 3 hours"
-
-    def test_future_in_1_day(self):
-        """future - in 1 day"""
-        result = timeago(1704150000, 1704067200)
-        assert result == "in 1 day"
-
-    def test_future_in_2_days(self):
-        """future - in 2 days"""
-        result = timeago(1704240000, 1704067200)
-        assert result == "in 2 days"
-
-    def test_future_in_1_month(self):
-        """future - in 1 month"""
-        result = timeago(1706745600, 1704067200)
-        assert result == "in 1 month"
-
-    def test_future_in_1_year(self):
-        """future - in 1 year"""
-        result = timeago(1735689600, 1704067200)
-        assert result == "in 1 year"
+try:
+    SPEC_CASES = spec_corpus.cases()
+except ImportError:
+    # No valid fixture and no PyYAML: the corpus tests are skipped
+    SPEC_CASES = []
 
 
-# ============================================================
-# DURATION TESTS (from tests.yaml)
-# ============================================================
+class TestSpecCorpus:
+    """Every tests.yaml case, loaded through spec_corpus."""
 
-class TestDuration:
-    """Tests for duration function."""
-
-    def test_zero_seconds(self):
-        """zero seconds"""
-        result = duration(0)
-        assert result == "0 seconds"
-
-    def test_1_second(self):
-        """1 second"""
-        result = duration(1)
-        assert result == "1 second"
-
-    def test_45_seconds(self):
-        """45 seconds"""
-        result = duration(45)
-        assert result == "45 seconds"
-
-    def test_1_minute(self):
-        """1 minute"""
-        result = duration(60)
-        assert result == "1 minute"
-
-    def test_1_minute_30_seconds(self):
-        """1 minute 30 seconds"""
-        result = duration(90)
-        assert result == "1 minute, 30 seconds"
-
-    def test_2_minutes(self):
-        """2 minutes"""
-        result = duration(120)
-        assert result == "2 minutes"
-
-    def test_1_hour(self):
-        """1 hour"""
-        result = duration(3600)
-        assert result == "1 hour"
-
-    def test_1_hour_1_minute(self):
-        """1 hour 1 minute"""
-        result = duration(3661)
-        assert result == "1 hour, 1 minute"
-
-    def test_1_hour_30_minutes(self):
-        """1 hour 30 minutes"""
-        result = duration(5400)
-        assert result == "1 hour, 30 minutes"
-
-    def test_2_hours_30_minutes(self):
-        """2 hours 30 minutes"""
-        result = duration(9000)
-        assert result == "2 hours, 30 minutes"
-
-    def test_1_day(self):
-        """1 day"""
-        result = duration(86400)
-        assert result == "1 day"
-
-    def test_1_day_2_hours(self):
-        """1 day 2 hours"""
-        result = duration(93600)
-        assert result == "1 day, 2 hours"
-
-    def test_7_days(self):
-        """7 days"""
-        result = duration(604800)
-        assert result == "7 days"
-
-    def test_1_month_30_days(self):
-        """1 month (30 days)"""
-        result = duration(2592000)
-        assert result == "1 month"
-
-    def test_1_year_365_days(self):
-        """1 year (365 days)"""
-        result = duration(31536000)
-        assert result == "1 year"
-
-    def test_1_year_2_months(self):
-        """1 year 2 months"""
-        result = duration(36720000)
-        assert result == "1 year, 2 months"
-
-    def test_compact_1h_1m(self):
-        """compact - 1h 1m"""
-        result = duration(3661, {'compact': True})
-        assert result == "1h 1m"
-
-    def test_compact_2h_30m(self):
-        """compact - 2h 30m"""
-        result = duration(9000, {'compact': True})
-        assert result == "2h 30m"
-
-    def test_compact_1d_2h(self):
-        """compact - 1d 2h"""
-        result = duration(93600, {'compact': True})
-        assert result == "1d 2h"
-
-    def test_compact_45s(self):
-        """compact - 45s"""
-        result = duration(45, {'compact': True})
-        assert result == "45s"
-
-    def test_compact_0s(self):
-        """compact - 0s"""
-        result = duration(0, {'compact': True})
-        assert result == "0s"
-
-    def test_max_units_1_hours_only(self):
-        """max_units 1 - hours only"""
-        result = duration(3661, {'max_units': 1})
-        assert result == "1 hour"
-
-    def test_max_units_1_days_only(self):
-        """max_units 1 - days only"""
-        result = duration(93600, {'max_units': 1})
-        assert result == "1 day"
-
-    def test_max_units_3(self):
-        """max_units 3"""
-        result = duration(93661, {'max_units': 3})
-        assert result == "1 day, 2 hours, 1 minute"
-
-    def test_compact_max_units_1(self):
-        """compact max_units 1"""
-        result = duration(9000, {'compact': True, 'max_units': 1})
-        assert result == "2h"
-
-    def test_error_negative_seconds(self):
-        """error - negative seconds"""
-        with pytest.raises(ValueError):
-            duration(-100)
+    @pytest.mark.parametrize("case", SPEC_CASES, ids=lambda case: f"{case.function}: {case.name}")
+    def test_spec_case(self, case):
+        """whenwords_lib matches the specification"""
+        func = getattr(whenwords_lib, case.function)
+        if case.error:
+            with pytest.raises(ValueError):
+                func(*case.args)
+        else:
+            assert func(*case.args) == case.output
 
 
 # ============================================================
-# PARSE_DURATION TESTS (from tests.yaml)
+# CIVIL DATE TESTS (integer path vs datetime)
 # ============================================================
 
-class TestParseDuration:
-    """Tests for parse_duration function."""
-
-    def test_compact_hours_minutes(self):
-        """compact hours minutes"""
-        result = parse_duration("2h30m")
-        assert result == 9000
-
-    def test_compact_with_space(self):
-        """compact with space"""
-        result = parse_duration("2h 30m")
-        assert result == 9000
-
-    def test_compact_with_comma(self):
-        """compact with comma"""
-        result = parse_duration("2h, 30m")
-        assert result == 9000
-
-    def test_verbose(self):
-        """verbose"""
-        result = parse_duration("2 hours 30 minutes")
-        assert result == 9000
-
-    def test_verbose_with_and(self):
-        """verbose with and"""
-        result = parse_duration("2 hours and 30 minutes")
-        assert result == 9000
-
-    def test_verbose_with_comma_and(self):
-        """verbose with comma and"""
-        result = parse_duration("2 hours, and 30 minutes")
-        assert result == 9000
-
-    def test_decimal_hours(self):
-        """decimal hours"""
-        result = parse_duration("2.5 hours")
-        assert result == 9000
-
-    def test_decimal_compact(self):
-        """decimal compact"""
-        result = parse_duration("1.5h")
-        assert result == 5400
-
-    def test_single_unit_minutes_verbose(self):
-        """single unit minutes verbose"""
-        result = parse_duration("90 minutes")
-        assert result == 5400
-
-    def test_single_unit_minutes_compact(self):
-        """single unit minutes compact"""
-        result = parse_duration("90m")
-        assert result == 5400
-
-    def test_single_unit_min(self):
-        """single unit min"""
-        result = parse_duration("90min")
-        assert result == 5400
-
-    def test_colon_notation_h_mm(self):
-        """colon notation h:mm"""
-        result = parse_duration("2:30")
-        assert result == 9000
-
-    def test_colon_notation_h_mm_ss(self):
-        """colon notation h:mm:ss"""
-        result = parse_duration("1:30:00")
-        assert result == 5400
-
-    def test_colon_notation_with_seconds(self):
-        """colon notation with seconds"""
-        result = parse_duration("0:05:30")
-        assert result == 330
-
-    def test_days_verbose(self):
-        """days verbose"""
-        result = parse_duration("2 days")
-        assert result == 172800
-
-    def test_days_compact(self):
-        """days compact"""
-        result = parse_duration("2d")
-        assert result == 172800
-
-    def test_weeks_verbose(self):
-        """weeks verbose"""
-        result = parse_duration("1 week")
-        assert result == 604800
-
-    def test_weeks_compact(self):
-        """weeks compact"""
-        result = parse_duration("1w")
-        assert result == 604800
-
-    def test_mixed_verbose(self):
-        """mixed verbose"""
-        result = parse_duration("1 day, 2 hours, and 30 minutes")
-        assert result == 95400
-
-    def test_mixed_compact(self):
-        """mixed compact"""
-        result = parse_duration("1d 2h 30m")
-        assert result == 95400
-
-    def test_seconds_only_verbose(self):
-        """seconds only verbose"""
-        result = parse_duration("45 seconds")
-        assert result == 45
-
-    def test_seconds_compact_s(self):
-        """seconds compact s"""
-        result = parse_duration("45s")
-        assert result == 45
-
-    def test_seconds_compact_sec(self):
-        """seconds compact sec"""
-        result = parse_duration("45sec")
-        assert result == 45
-
-    def test_hours_hr(self):
-        """hours hr"""
-        result = parse_duration("2hr")
-        assert result == 7200
-
-    def test_hours_hrs(self):
-        """hours hrs"""
-        result = parse_duration("2hrs")
-        assert result == 7200
-
-    def test_minutes_mins(self):
-        """minutes mins"""
-        result = parse_duration("30mins")
-        assert result == 1800
-
-    def test_case_insensitive(self):
-        """case insensitive"""
-        result = parse_duration("2H 30M")
-        assert result == 9000
-
-    def test_whitespace_tolerance(self):
-        """whitespace tolerance"""
-        result = parse_duration("  2 hours   30 minutes  ")
-        assert result == 9000
-
-    def test_error_empty_string(self):
-        """error - empty string"""
-        with pytest.raises(ValueError):
-            parse_duration("")
-
-    def test_error_no_units(self):
-        """error - no units"""
+class TestCivilDates:
+    """Differential tests of the integer calendar path against datetime."""
+
+    @staticmethod
+    def datetime_human_date(timestamp, reference):
+        ts_dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        ref_dt = datetime.fromtimestamp(reference, tz=timezone.utc)
+        diff_days = (ts_dt.date() - ref_dt.date()).days
+        if diff_days == 0:
+            return "Today"
+        if diff_days == -1:
+            return "Yesterday"
+        if diff_days == 1:
+            return "Tomorrow"
+        if -7 < diff_days < 0:
+            return ts_dt.strftime("Last %A")
+        if 0 < diff_days < 7:
+            return ts_dt.strftime("This %A")
+        if ts_dt.year == ref_dt.year:
+            return f"{ts_dt:%B} {ts_dt.day}"
+        return f"{ts_dt:%B} {ts_dt.day}, {ts_dt.year}"
+
+    @staticmethod
+    def datetime_date_range(start, end):
+        start, end = sorted((start, end))
+        s = datetime.fromtimestamp(start, tz=timezone.utc)
+        e = datetime.fromtimestamp(end, tz=timezone.utc)
+        if s.date() == e.date():
+            return f"{s:%B} {s.day}, {s.year}"
+        if (s.year, s.month) == (e.year, e.month):
+            return f"{s:%B} {s.day}\u2013{e.day}, {s.year}"
+        if s.year == e.year:
+            return f"{s:%B} {s.day} \u2013 {e:%B} {e.day}, {s.year}"
+        return f"{s:%B} {s.day}, {s.year} \u2013 {e:%B} {e.day}, {e.year}"
+
+    def test_civil_from_days_matches_datetime(self):
+        """every day 1751-2188 plus a sparse sweep of years 1-9999"""
+        epoch = date(1970, 1, 1).toordinal()
+        for days in list(range(-80000, 80000)) + list(range(-719162, 2932897, 997)):
+            d = date.fromordinal(epoch + days)
+            assert _civil_from_days(days) == (d.year, d.month, d.day, d.weekday())
+
+    def test_human_date_and_date_range_match_datetime(self):
+        """random timestamp pairs across years 1-9999"""
+        rng = random.Random(6)
+        for _ in range(20000):
+            ts = rng.randint(-62135596800, 253402214400)
+            ref = ts + rng.choice([0, 1, 86400, 7 * 86400, 400 * 86400]) * rng.randint(-3, 3)
+            ref = min(max(ref + rng.randint(-86400, 86400), -62135596800), 253402300799)
+            assert human_date(ts, ref) == self.datetime_human_date(ts, ref)
+            assert date_range(ts, ref) == self.datetime_date_range(ts, ref)
+
+    def test_years_1_to_9999_are_accepted(self):
+        """the first and last second of the supported years format"""
+        assert human_date(-62135596800, 0) == "January 1, 1"
+        assert human_date(253402300799, 0) == "December 31, 9999"
+        assert date_range(-62135596800, 253402300799) == "January 1, 1 \u2013 December 31, 9999"
+
+    @pytest.mark.parametrize("timestamp", [-62135596801, 253402300800, -10 ** 14])
+    def test_years_outside_1_to_9999_are_rejected(self, timestamp):
+        """one second past either end raises like datetime did"""
         with pytest.raises(ValueError):
-            parse_duration("hello world")
-
-    def test_error_negative(self):
-        """error - negative"""
+            human_date(timestamp, 0)
         with pytest.raises(ValueError):
-            parse_duration("-5 hours")
-
-    def test_error_just_number(self):
-        """error - just number"""
+            human_date(0, timestamp)
         with pytest.raises(ValueError):
-            parse_duration("42")
+            date_range(timestamp, 0)
 
 
 # ============================================================
-# HUMAN_DATE TESTS (from tests.yaml)
+# INTERPRETER TESTS
 # ============================================================
 
-class TestHumanDate:
-    """Tests for human_date function."""
-
-    def test_today(self):
-        """today"""
-        result = human_date(1705276800, 1705276800)
-        assert result == "Today"
-
-    def test_today_same_day_different_time(self):
-        """today - same day different time"""
-        result = human_date(1705320000, 1705276800)
-        assert result == "Today"
-
-    def test_yesterday(self):
-        """yesterday"""
-        result = human_date(1705190400, 1705276800)
-        assert result == "Yesterday"
-
-    def test_tomorrow(self):
-        """tomorrow"""
-        result = human_date(1705363200, 1705276800)
-        assert result == "Tomorrow"
-
-    def test_last_sunday_1_day_before_monday(self):
-        """last Sunday (1 day before Monday)"""
-        result = human_date(1705190400, 1705276800)
-        assert result == "Yesterday"
-
-    def test_last_saturday_2_days_ago(self):
-        """last Saturday (2 days ago)"""
-        result = human_date(1705104000, 1705276800)
-        assert result == "Last Saturday"
-
-    def test_last_friday_3_days_ago(self):
-        """last Friday (3 days ago)"""
-        result = human_date(1705017600, 1705276800)
-        assert result == "Last Friday"
-
-    def test_last_thursday_4_days_ago(self):
-        """last Thursday (4 days ago)"""
-        result = human_date(1704931200, 1705276800)
-        assert result == "Last Thursday"
-
-    def test_last_wednesday_5_days_ago(self):
-        """last Wednesday (5 days ago)"""
-        result = human_date(1704844800, 1705276800)
-        assert result == "Last Wednesday"
-
-    def test_last_tuesday_6_days_ago(self):
-        """last Tuesday (6 days ago)"""
-        result = human_date(1704758400, 1705276800)
-        assert result == "Last Tuesday"
-
-    def test_last_monday_7_days_ago_becomes_date(self):
-        """last Monday (7 days ago) - becomes date"""
-        result = human_date(1704672000, 1705276800)
-        assert result == "January 8"
-
-    def test_this_tuesday_1_day_future(self):
-        """this Tuesday (1 day future)"""
-        result = human_date(1705363200, 1705276800)
-        assert result == "Tomorrow"
-
-    def test_this_wednesday_2_days_future(self):
-        """this Wednesday (2 days future)"""
-        result = human_date(1705449600, 1705276800)
-        assert result == "This Wednesday"
-
-    def test_this_thursday_3_days_future(self):
-        """this Thursday (3 days future)"""
-        result = human_date(1705536000, 1705276800)
-        assert result == "This Thursday"
-
-    def test_this_sunday_6_days_future(self):
-        """this Sunday (6 days future)"""
-        result = human_date(1705795200, 1705276800)
-        assert result == "This Sunday"
-
-    def test_next_monday_7_days_future_becomes_date(self):
-        """next Monday (7 days future) - becomes date"""
-        result = human_date(1705881600, 1705276800)
-        assert result == "January 22"
-
-    def test_same_year_different_month(self):
-        """same year different month"""
-        result = human_date(1709251200, 1705276800)
-        assert result == "March 1"
-
-    def test_same_year_end_of_year(self):
-        """same year end of year"""
-        result = human_date(1735603200, 1705276800)
-        assert result == "December 31"
-
-    def test_previous_year(self):
-        """previous year"""
-        result = human_date(1672531200, 1705276800)
-        assert result == "January 1, 2023"
-
-    def test_next_year(self):
-        """next year"""
-        result = human_date(1736121600, 1705276800)
-        assert result == "January 6, 2025"
+BF_DIR = os.path.dirname(os.path.abspath(__file__))
+BF_PROGRAMS = ['timeago.bf', 'duration.bf', 'parse_duration.bf', 'human_date.bf', 'date_range.bf']
+BF_PROGRAM_OUTPUTS = {
+    'timeago.bf': 'just now',
+    'duration.bf': '0 seconds',
+    'parse_duration.bf': '0',
+    'human_date.bf': 'Today',
+    'date_range.bf': 'January 1, 2024',
+}
+
+
+def random_bf_program(rng, length=40):
+    """Random balanced Brainfuck program biased toward optimizable idioms."""
+    pieces = ['+', '-', '>', '<', '.', ',', '[-]', '[+]', '[->+<]', '[-<++>]', '[>>+<<-]']
+    code = ''
+    depth = 0
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.1:
+            code += '['
+            depth += 1
+        elif r < 0.2 and depth:
+            code += ']'
+            depth -= 1
+        else:
+            code += rng.choice(pieces) * rng.randint(1, 4)
+    return code + ']' * depth
+
 
+def run_bf(run, code, **kwargs):
+    """Return output, or the exception type raised."""
+    try:
+        return run(code, **kwargs)
+    except (RuntimeError, ValueError) as e:
+        return type(e)
 
-# ============================================================
-# DATE_RANGE TESTS (from tests.yaml)
-# ============================================================
 
-class TestDateRange:
-    """Tests for date_range function."""
-
-    def test_same_day(self):
-        """same day"""
-        result = date_range(1705276800, 1705276800)
-        assert result == "January 15, 2024"
-
-    def test_same_day_different_times(self):
-        """same day different times"""
-        result = date_range(1705276800, 1705320000)
-        assert result == "January 15, 2024"
-
-    def test_consecutive_days_same_month(self):
-        """consecutive days same month"""
-        result = date_range(1705276800, 1705363200)
-        assert result == "January 15\u201316, 2024"
-
-    def test_same_month_range(self):
-        """same month range"""
-        result = date_range(1705276800, 1705881600)
-        assert result == "January 15\u201322, 2024"
-
-    def test_same_year_different_months(self):
-        """same year different months"""
-        result = date_range(1705276800, 1707955200)
-        assert result == "January 15 \u2013 February 15, 2024"
-
-    def test_different_years(self):
-        """different years"""
-        result = date_range(1703721600, 1705276800)
-        assert result == "December 28, 2023 \u2013 January 15, 2024"
-
-    def test_full_year_span(self):
-        """full year span"""
-        result = date_range(1704067200, 1735603200)
-        assert result == "January 1 \u2013 December 31, 2024"
-
-    def test_swapped_inputs_should_auto_correct(self):
-        """swapped inputs - should auto-correct"""
-        result = date_range(1705881600, 1705276800)
-        assert result == "January 15\u201322, 2024"
-
-    def test_multi_year_span(self):
-        """multi-year span"""
-        result = date_range(1672531200, 1735689600)
-        assert result == "January 1, 2023 \u2013 January 1, 2025"
+class TestInterpreter:
+    """Tests for the bf.py interpreter."""
+
+    def test_hello_world_prefix(self):
+        """usage.md example"""
+        assert bf.interpret("++++++++[>++++[>++>+++>+++>+<<<<-]>+>+>->>+[<]<-]>>.") == "H"
+
+    def test_echo_input(self):
+        """echo input"""
+        assert bf.interpret(",.", "A") == "A"
+
+    def test_eof_reads_zero(self):
+        """reading past the end of input gives 0"""
+        assert bf.interpret(",,,+.", "A") == "\x01"
+
+    def test_unmatched_brackets(self):
+        """unmatched brackets are rejected"""
+        with pytest.raises(ValueError):
+            bf.interpret("[")
+        with pytest.raises(ValueError):
+            bf.interpret("]")
+
+    def test_clear_loop_wraps(self):
+        """[+] counts up through the cell width"""
+        assert bf.interpret("-[+]+.", cell_bits=8) == "\x01"
+
+    def test_max_steps_counts_source_instructions(self):
+        """max_steps is counted in original instructions"""
+        code = "+++++[-]"  # 5 + 1 + 2 * 5 = 16 steps
+        assert bf.interpret(code, max_steps=16) == ""
+        with pytest.raises(RuntimeError):
+            bf.interpret(code, max_steps=15)
+
+    def test_pointer_wraps(self):
+        """moving left from cell 0 wraps to the end of the tape"""
+        assert bf.interpret("<+++.>.<.", tape_size=4) == "\x03\x00\x03"
+
+    def test_tape_is_sized_by_cell_bits(self):
+        """tapes use the narrowest unsigned array for the cell size"""
+        assert bf._new_tape(8, 10).typecode == "B"
+        assert bf._new_tape(16, 10).itemsize == 2
+        assert bf._new_tape(32, 10).itemsize == 4
+        assert bf._new_tape(64, 10).itemsize == 8
+        assert bf._new_tape(128, 10) == [0] * 10
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_cells_wider_than_64_bits(self, backend):
+        """wide cells fall back to a list tape"""
+        assert bf.interpret("-.<--.>+.", cell_bits=80, tape_size=4, backend=backend) == "\xff\xfe\x00"
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_input_is_truncated_to_cell_size(self, backend):
+        """input characters wider than a cell are masked to fit"""
+        assert bf.interpret(",.", "Ł", cell_bits=8, backend=backend) == "\x41"
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_grow_extends_tape_both_ways(self, backend):
+        """the grow policy starts small and extends in either direction"""
+        code = ">" * 1000 + "+." + "<" * 3000 + "++[->>+<<]>>."
+        assert bf.interpret(code, bounds="grow", tape_size=4, backend=backend) == "\x01\x02"
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_error_policy_rejects_leaving_tape(self, backend):
+        """the error policy raises instead of wrapping"""
+        assert bf.interpret(">>>+.", tape_size=4, bounds="error", backend=backend) == "\x01"
+        with pytest.raises(RuntimeError):
+            bf.interpret(">>>>", tape_size=4, bounds="error", backend=backend)
+        with pytest.raises(RuntimeError):
+            bf.interpret("+[-<+>]", tape_size=4, bounds="error", backend=backend)
+
+    @pytest.mark.parametrize("backend", bf.BACKENDS)
+    @pytest.mark.parametrize("code, kwargs, message", [
+        ("<>+.", {}, "cell -1"),
+        (">>>>><+.", {}, "cell 5"),
+        (">>>+[->>+-<<]", {}, "cell 5"),
+        ("-[>+<-]<", {"cell_bits": 16, "max_steps": 1000}, "exceeded 1000 steps"),
+        (">>>>+[->+<]", {"max_steps": 7}, "exceeded 7 steps"),
+        (">>>>+[->+<]", {"max_steps": 8}, "cell 5"),
+        ("+++>>>>>>", {"max_steps": 7}, "exceeded 7 steps"),
+        ("+++>>>>>>", {"max_steps": 8}, "cell 5"),
+    ])
+    def test_error_policy_checks_every_move(self, backend, code, kwargs, message):
+        """every backend stops with the same error at the same move"""
+        with pytest.raises(RuntimeError, match=message):
+            bf.interpret(code, tape_size=5, bounds="error", backend=backend, **kwargs)
+
+    def test_error_policy_splits_pointer_runs(self):
+        """exact_moves splits <> runs that turn around and keeps loops that overshoot"""
+        program = bf.compile_program("><<+[->>+-<+<]", exact_moves=True)
+        assert [(op, arg) for op, arg, _ in program][:3] == [(bf.MOVE, 1), (bf.MOVE, -2), (bf.ADD, 1)]
+        assert bf.MULADD not in [op for op, _, _ in program]
+        assert bf.MULADD in [op for op, _, _ in bf.compile_program("[->>+-<+<]")]
+        assert bf.MULADD in [op for op, _, _ in bf.compile_program("[->>+<+<]", exact_moves=True)]
+
+    def test_unknown_bounds_policy(self):
+        """unknown bounds policies are rejected"""
+        with pytest.raises(ValueError):
+            bf.interpret("+", bounds="clamp")
+        with pytest.raises(ValueError):
+            bf_interpret("+", bounds="clamp")
+
+    def test_bf_interpret_bounds(self):
+        """whenwords_lib.bf_interpret supports the same bounds policies"""
+        assert bf_interpret("<+.>>.<.", tape_size=3) == "\x01\x00\x00"
+        assert bf_interpret("<<<+++[->+<]>.", bounds="grow") == "\x03"
+        assert bf_interpret(">" * 1000 + "+.", bounds="grow") == "\x01"
+        with pytest.raises(RuntimeError):
+            bf_interpret("<", bounds="error")
+
+    @pytest.mark.parametrize("backend", bf.BACKENDS)
+    def test_bf_interpret_uses_bf_engine(self, backend):
+        """whenwords_lib.bf_interpret behaves exactly like bf.interpret"""
+        code = "++++++++[>++++++++<-]>+.,[.,]"
+        assert bf_interpret(code, "xyz", backend=backend) == bf.interpret(code, "xyz") == "Axyz"
+        with pytest.raises(ValueError):
+            bf_interpret("[[]", backend=backend)
+        with pytest.raises(ValueError):
+            bf_interpret("+]", backend=backend)
+        with pytest.raises(RuntimeError):
+            bf_interpret("+[]", max_steps=1000, backend=backend)
+
+    def test_padded_clear_loop_step_cost(self):
+        """clear loops with extra moves are charged for every instruction"""
+        code = "+++[-><]"  # 3 + 1 + 3 * 4 = 16 steps
+        assert bf.interpret(code, max_steps=16) == ""
+        with pytest.raises(RuntimeError):
+            bf.interpret(code, max_steps=15)
+
+    def test_profile_counts_each_instruction(self):
+        """profiles count executions per source character"""
+        profile = bf.Profile()
+        code = "++\n[->+<] comment\n>."
+        assert bf.interpret(code, profile=profile) == "\x02"
+        assert profile.counts == [1, 1, 0, 1, 2, 2, 2, 2, 2] + [0] * 9 + [1, 1]
+        assert profile.steps == 1 + 1 + 1 + 4 * 2 + 2 + 1 + 1
+        (loop,) = profile.loops()
+        assert loop == bf.LoopProfile(line=2, column=1, end_line=2, end_column=6,
+                                      entries=1, iterations=2, steps=11)
+        assert "<bf>:2:1-2:6" in profile.report()
+
+    def test_profile_matches_reference_step_count(self):
+        """profiled step totals are exactly what the reference interpreter counts"""
+        rng = random.Random(14)
+        for _ in range(200):
+            code = random_bf_program(rng)
+            profile = bf.Profile()
+            kwargs = dict(input_data="\x05\x03", cell_bits=8, tape_size=16)
+            if run_bf(bf.interpret, code, max_steps=5000, profile=profile, **kwargs) is RuntimeError:
+                continue
+            assert run_bf(bf.interpret_reference, code, max_steps=profile.steps, **kwargs) \
+                is not RuntimeError
+            assert run_bf(bf.interpret_reference, code, max_steps=profile.steps - 1, **kwargs) \
+                is RuntimeError
+
+    def test_profile_survives_step_limit(self):
+        """a run stopped by max_steps still fills the profile"""
+        profile = bf.Profile()
+        with pytest.raises(RuntimeError):
+            bf.interpret("+[>+<]", max_steps=1000, profile=profile)
+        (loop,) = profile.loops()
+        assert loop.entries == 1 and loop.iterations > 100
+        assert profile.steps > 1000
+
+    def test_step_budget_pauses_and_resumes(self):
+        """a budgeted run returns a machine that can be continued"""
+        code = "++++++++[>++++++++<-]>+.+.+." + "[>.<-]" * 3
+        machine = bf.interpret(code, step_budget=20)
+        assert isinstance(machine, bf.Machine)
+        assert machine.steps >= 20 and not machine.finished
+        slices = 1
+        while not machine.run(steps=20):
+            slices += 1
+        assert slices > 2
+        assert machine.output == bf.interpret(code)
+        assert bf.interpret(code, step_budget=10 ** 6) == machine.output
+
+    def test_machine_state_is_picklable(self):
+        """paused machines can be saved and continued elsewhere"""
+        machine = bf.Machine(",[.,]", "hello")
+        assert not machine.run(steps=8)
+        assert machine.output == "he"
+        restored = pickle.loads(pickle.dumps(machine))
+        assert restored.run() and restored.output == "hello"
+
+    def test_time_budget_pauses_endless_loop(self):
+        """a wall-clock budget stops programs that never end"""
+        machine = bf.interpret("+[]", max_steps=None, time_budget=0.05)
+        assert not machine.finished and machine.steps > 0
+        assert not machine.run(seconds=0.01)
+
+    def test_machine_still_enforces_max_steps(self):
+        """max_steps applies across slices"""
+        machine = bf.Machine("+[]", max_steps=1000)
+        assert not machine.run(steps=500)
+        with pytest.raises(RuntimeError):
+            machine.run()
+
+    def test_transfer_loops_fold_to_muladd(self):
+        """move/multiply loops compile to single MULADD instructions"""
+        ops = [op for op, _, _ in bf.compile_program("[->+<]>[-<++++++++++>]<<[>>>>+<<<<-]")]
+        assert ops == [bf.MULADD, bf.MOVE, bf.MULADD, bf.MOVE, bf.MULADD]
+
+    def test_multiply_loop(self):
+        """[->+++<] multiplies into the next cell"""
+        assert bf.interpret("+++++++[->+++<]>.<.") == "\x15\x00"
+
+    def test_muladd_on_32_bit_values(self):
+        """transfer of a 32-bit value runs in constant time"""
+        code = "-[->+<]>[-<++>]<."  # 2 * (2**32 - 1) wraps to 2**32 - 2
+        assert bf.interpret(code, max_steps=None) == "\xfe"
+
+    def test_muladd_step_cost(self):
+        """MULADD is charged its original instruction count"""
+        code = "+++[->+<]"  # 3 + 1 + 3 * 5 = 19 steps
+        assert bf.interpret(code, max_steps=19) == ""
+        with pytest.raises(RuntimeError):
+            bf.interpret(code, max_steps=18)
+
+    def test_unbalanced_loop_is_not_folded(self):
+        """loops that move the pointer are left as jumps"""
+        ops = [op for op, _, _ in bf.compile_program("[->+]")]
+        assert bf.MULADD not in ops
+
+    def test_analyze_balanced_program(self):
+        """balanced programs have a known footprint; loops on a zero cell are dead"""
+        code = "[>+<-]<<+>>>[-]x[.>]>[-<+>]"
+        analysis = bf.analyze(code)
+        assert analysis == bf.Analysis(-2, 2, [], [0, 16])
+
+    def test_analyze_unbalanced_program(self):
+        """a loop that moves the pointer leaves the footprint unknown"""
+        analysis = bf.analyze("+[>+<-]>[>]<")
+        assert analysis.min_offset is None and analysis.max_offset is None
+        assert analysis.unbalanced_loops == [8]
+        assert analysis.dead_loops == []
+
+    def test_dead_loops_keep_step_count(self):
+        """eliminated loops are still charged for their ["""
+        code = "[.]+[-][>+<][-]."   # 1 + 1 + 3 + 1 + 1 + 1 = 8 steps
+        machine = bf.Machine(code)
+        assert len(machine.program) == 3
+        for backend in ("reference", "ir", "python"):
+            assert bf.interpret(code, max_steps=8, backend=backend) == "\x00"
+            with pytest.raises(RuntimeError):
+                bf.interpret(code, max_steps=7, backend=backend)
+
+    def test_balanced_program_gets_exact_tape(self):
+        """the tape holds only the cells a balanced program can reach"""
+        machine = bf.Machine("<<+>>>+[->+<]")
+        assert len(machine.tape) == 5 and machine.ptr == 2
+        assert len(bf.Machine("+[>+]").tape) == bf.DEFAULT_TAPE_SIZE
+
+    def test_python_backend_skips_wrap_when_footprint_is_known(self):
+        """proven in-bounds moves compile without modulo or bounds checks"""
+        assert "% T" not in bf.transpile("<+>>+<[-<+>]")
+        assert "% T" in bf.transpile("+[>+]")
+        assert "_fit" not in bf.transpile(">+<[->+<]", bounds="error")
+        assert "_fit" in bf.transpile("<+", bounds="error")
+
+    @pytest.mark.parametrize("backend", ["ir", "python"])
+    def test_footprint_wider_than_tape_still_wraps(self, backend):
+        """a footprint that does not fit the tape keeps wrapping semantics"""
+        code = "+>>>>+<<<<."   # cell 4 aliases cell 0 on a 4-cell tape
+        assert bf.interpret(code, tape_size=4, backend=backend) == "\x02"
+
+    def test_transpile_emits_nested_loops(self):
+        """the Python backend turns loops into while blocks"""
+        source = bf.transpile("+[>+[-]<-].")
+        assert "while tape[p]:" in source
+        compile(source, "<test>", "exec")
+
+    def test_python_backend_caches_code_objects(self):
+        """transpiled programs are compiled once per source"""
+        code = "++[->+<]>."
+        bf.interpret(code, backend="python")
+        misses = bf._python_object.cache_info().misses
+        assert bf.interpret(code, backend="python") == "\x02"
+        assert bf.interpret(code + " comment", backend="python") == "\x02"
+        assert bf._python_object.cache_info().misses == misses
+
+    def test_compile_caches_are_bounded(self):
+        """the in-memory compile caches evict least recently used programs"""
+        for i in range(bf.COMPILE_CACHE_SIZE + 10):
+            code = "+" * i + "."
+            assert bf.interpret(code, backend="python") == chr(i % 256)
+        assert bf._compile_filtered.cache_info().currsize <= bf.COMPILE_CACHE_SIZE
+        assert bf._python_object.cache_info().currsize <= bf.COMPILE_CACHE_SIZE
+        assert bf._filtered.cache_info().currsize <= bf.COMPILE_CACHE_SIZE
+
+    def test_python_backend_falls_back_when_nested_too_deep(self):
+        """loops nested beyond CPython's block limit still run"""
+        depth = bf.MAX_TRANSPILE_DEPTH + 1
+        code = "+" + "[>+" * depth + "[-]" + "<[-]]" * depth + "+."
+        assert bf.compile_python(code) is None
+        assert bf.interpret(code, backend="python") == "\x01"
+
+    def test_unknown_backend(self):
+        """unknown backends are rejected"""
+        with pytest.raises(ValueError):
+            bf.interpret("+", backend="jit")
+
+    @pytest.mark.parametrize("bounds", ["wrap", "grow"])
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    @pytest.mark.parametrize("name", BF_PROGRAMS)
+    def test_shipped_programs(self, name, backend, bounds):
+        """shipped .bf programs produce their expected output"""
+        path = os.path.join(BF_DIR, name)
+        assert bf.run_file(path, backend=backend, bounds=bounds) == BF_PROGRAM_OUTPUTS[name]
+
+    @pytest.mark.parametrize("backend", ["ir", "python"])
+    def test_matches_reference_on_random_programs(self, backend):
+        """optimized execution matches the reference interpreter"""
+        rng = random.Random(11)
+        for _ in range(500):
+            code = random_bf_program(rng)
+            kwargs = dict(input_data="\x05\x03\x07", cell_bits=8, tape_size=16, max_steps=5000)
+            assert (run_bf(bf.interpret, code, backend=backend, **kwargs)
+                    == run_bf(bf.interpret_reference, code, **kwargs))
+
+    @pytest.mark.parametrize("backend", ["ir", "python"])
+    def test_grow_matches_reference_on_random_programs(self, backend):
+        """growing tapes behave the same on every backend"""
+        rng = random.Random(12)
+        for _ in range(300):
+            code = random_bf_program(rng)
+            kwargs = dict(input_data="\x05\x03\x07", cell_bits=8, max_steps=5000, bounds="grow")
+            assert (run_bf(bf.interpret, code, backend=backend, **kwargs)
+                    == run_bf(bf.interpret_reference, code, **kwargs))
+
+    @pytest.mark.parametrize("bounds", ["wrap", "grow"])
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_interpret_many_matches_interpret(self, backend, bounds):
+        """batch runs give the same outputs as separate runs, in order"""
+        code = ",[>+<-]>[<+>-]<<<++>,.[->+<]>."  # leaves cells dirty between runs
+        inputs = ["\x03\x04", "", "\x01", "\x07\x00"]
+        expected = [bf.interpret(code, data, bounds=bounds) for data in inputs]
+        assert bf.interpret_many(code, inputs, backend=backend, bounds=bounds) == expected
+
+    def test_interpret_many_process_pool(self):
+        """inputs can be spread over worker processes"""
+        inputs = [chr(i) for i in range(40)]
+        assert bf.interpret_many(",+.", inputs, max_workers=2, chunk_size=7) == [
+            chr(i + 1) for i in range(40)]
+
+    def test_interpret_many_errors(self):
+        """a failing input fails the batch"""
+        with pytest.raises(RuntimeError):
+            bf.interpret_many(",[]", ["", "\x01"], max_steps=1000)
+        with pytest.raises(ValueError):
+            bf.interpret_many("+", ["a", "b"], max_workers=2, chunk_size=0)
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_interpret_stream_matches_interpret(self, backend):
+        """streaming gives the same bytes as string I/O"""
+        rng = random.Random(13)
+        for _ in range(100):
+            code = random_bf_program(rng)
+            kwargs = dict(cell_bits=8, tape_size=16, max_steps=5000)
+            expected = run_bf(bf.interpret, code, input_data="\x05\x03\x07\xff", **kwargs)
+            writer = io.BytesIO()
+            result = run_bf(bf.interpret_stream, code, reader=io.BytesIO(b"\x05\x03\x07\xff"),
+                            writer=writer, backend=backend, **kwargs)
+            if isinstance(expected, str):
+                assert result is None
+                assert writer.getvalue() == expected.encode("latin-1")
+            else:
+                assert result is expected
+
+    @pytest.mark.parametrize("backend", ["reference", "ir", "python"])
+    def test_interpret_stream_flushes_on_error(self, backend):
+        """output written before a failure still reaches the writer"""
+        writer = io.BufferedWriter(io.BytesIO())
+        with pytest.raises(RuntimeError):
+            bf.interpret_stream("+.+[]", io.BytesIO(), writer, max_steps=100, backend=backend)
+        assert writer.raw.getvalue() == b"\x01"
+
+    @pytest.mark.parametrize("backend", ["ir", "python"])
+    def test_run_file_streams(self, tmp_path, backend):
+        """run_file streams when given a writer"""
+        source = tmp_path / "upper.bf"
+        source.write_text(",[" + "-" * 32 + ".,]")
+        writer = io.BytesIO()
+        assert bf.run_file(str(source), io.BytesIO(b"abc"), backend=backend, writer=writer) is None
+        assert writer.getvalue() == b"ABC"
+
+    def test_cli_streams_stdin(self, tmp_path):
+        """the command line streams stdin to stdout"""
+        source = tmp_path / "cat.bf"
+        source.write_text(",[.,]")
+        data = bytes(range(1, 256)) * 100
+        result = subprocess.run([sys.executable, os.path.join(BF_DIR, "bf.py"), str(source)],
+                                input=data, capture_output=True, check=True)
+        assert result.stdout == data
+
+    @pytest.mark.parametrize("backend", ["ir", "python"])
+    def test_run_file_writes_and_reuses_cache(self, tmp_path, monkeypatch, backend):
+        """compiled programs are cached next to the source and reused"""
+        source = tmp_path / "add.bf"
+        source.write_text("+++[->+<]>.")
+        assert bf.run_file(str(source), backend=backend) == "\x03"
+        path = bf.cache_path(str(source))
+        assert os.path.exists(path)
+
+        bf._file_cache.clear()
+        monkeypatch.setattr(bf, "compile_program", None)
+        monkeypatch.setattr(bf, "_python_code", None)
+        assert bf.run_file(str(source), backend=backend) == "\x03"
+
+    def test_run_file_cache_invalidated_on_edit(self, tmp_path):
+        """editing the source recompiles it"""
+        source = tmp_path / "edit.bf"
+        source.write_text("++.")
+        assert bf.run_file(str(source)) == "\x02"
+        source.write_text("+++.")
+        assert bf.run_file(str(source)) == "\x03"
+        bf._file_cache.clear()
+        assert bf.run_file(str(source)) == "\x03"
+
+    def test_run_file_ignores_bad_cache(self, tmp_path, monkeypatch):
+        """corrupt or out-of-date cache files are rebuilt"""
+        source = tmp_path / "bad.bf"
+        source.write_text("++++.")
+        path = bf.cache_path(str(source))
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not marshal data")
+        bf._file_cache.clear()
+        assert bf.run_file(str(source)) == "\x04"
+
+        bf._file_cache.clear()
+        monkeypatch.setattr(bf, "CACHE_VERSION", bf.CACHE_VERSION + 1)
+        assert bf.run_file(str(source)) == "\x04"
+        with open(path, "rb") as f:
+            assert marshal.load(f)["version"] == bf.CACHE_VERSION
 
 
 # ============================================================
@@ -18,8 +18,9 @@ but for full test coverage, use this module as the library interface.
 """
 
 import re
-from datetime import datetime, timezone
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Tuple, Union
+
+import bf
 
 
 # ============================================================
@@ -242,6 +243,59 @@ def parse_duration(text: str) -> int:
     return int(total)
 
 
+_WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+_MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+           'July', 'August', 'September', 'October', 'November', 'December']
+
+
+# Day numbers of 0001-01-01 and 9999-12-31, the years datetime supports
+_MIN_DAY = -719162
+_MAX_DAY = 2932896
+
+
+def _utc_days(timestamp: int) -> int:
+    """
+    Whole UTC days since the Unix epoch.
+
+    Raises:
+        ValueError: If the day falls outside years 1-9999
+    """
+    days = int(timestamp // 86400)
+    if not _MIN_DAY <= days <= _MAX_DAY:
+        raise ValueError(f"Timestamp out of range (years 1-9999): {timestamp}")
+    return days
+
+
+def _civil_from_days(days: int) -> Tuple[int, int, int, int]:
+    """
+    Converts days since 1970-01-01 to (year, month, day, weekday).
+
+    Uses Howard Hinnant's integer civil_from_days algorithm (proleptic
+    Gregorian calendar) instead of building datetime objects.
+
+    Args:
+        days: Whole days since the Unix epoch (may be negative)
+
+    Returns:
+        Tuple of year, month (1-12), day (1-31), weekday (0 = Monday)
+
+    Examples:
+        >>> _civil_from_days(19737)
+        (2024, 1, 15, 0)
+    """
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (month <= 2)
+    # 1970-01-01 was a Thursday
+    return year, month, day, (days + 3) % 7
+
+
 def human_date(timestamp: int, reference: int) -> str:
     """
     Returns a contextual date string relative to a reference date.
@@ -253,23 +307,19 @@ def human_date(timestamp: int, reference: int) -> str:
     Returns:
         Contextual date string
 
+    Raises:
+        ValueError: If either date is outside years 1-9999
+
     Examples:
         >>> human_date(1705276800, 1705276800)
         'Today'
         >>> human_date(1705190400, 1705276800)
         'Yesterday'
     """
-    ts_dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-    ref_dt = datetime.fromtimestamp(reference, tz=timezone.utc)
-
-    ts_date = ts_dt.date()
-    ref_date = ref_dt.date()
+    ts_days = _utc_days(timestamp)
+    ref_days = _utc_days(reference)
 
-    diff_days = (ts_date - ref_date).days
-
-    weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    months = ['January', 'February', 'March', 'April', 'May', 'June',
-              'July', 'August', 'September', 'October', 'November', 'December']
+    diff_days = ts_days - ref_days
 
     if diff_days == 0:
         return "Today"
@@ -277,20 +327,18 @@ def human_date(timestamp: int, reference: int) -> str:
         return "Yesterday"
     elif diff_days == 1:
         return "Tomorrow"
-    elif -7 < diff_days < 0:
-        weekday = weekdays[ts_dt.weekday()]
-        return f"Last {weekday}"
+
+    year, month, day, weekday = _civil_from_days(ts_days)
+
+    if -7 < diff_days < 0:
+        return f"Last {_WEEKDAYS[weekday]}"
     elif 0 < diff_days < 7:
-        weekday = weekdays[ts_dt.weekday()]
-        return f"This {weekday}"
+        return f"This {_WEEKDAYS[weekday]}"
     else:
-        month = months[ts_dt.month - 1]
-        day = ts_dt.day
-
-        if ts_dt.year == ref_dt.year:
-            return f"{month} {day}"
+        if year == _civil_from_days(ref_days)[0]:
+            return f"{_MONTHS[month - 1]} {day}"
         else:
-            return f"{month} {day}, {ts_dt.year}"
+            return f"{_MONTHS[month - 1]} {day}, {year}"
 
 
 def date_range(start: int, end: int) -> str:
@@ -304,6 +352,9 @@ def date_range(start: int, end: int) -> str:
     Returns:
         Formatted date range string
 
+    Raises:
+        ValueError: If either date is outside years 1-9999
+
     Note:
         If start > end, they are silently swapped.
 
@@ -317,102 +368,70 @@ def date_range(start: int, end: int) -> str:
     if start > end:
         start, end = end, start
 
-    start_dt = datetime.fromtimestamp(start, tz=timezone.utc)
-    end_dt = datetime.fromtimestamp(end, tz=timezone.utc)
+    start_days = _utc_days(start)
+    end_days = _utc_days(end)
 
-    months = ['January', 'February', 'March', 'April', 'May', 'June',
-              'July', 'August', 'September', 'October', 'November', 'December']
+    start_year, start_mon, start_day, _ = _civil_from_days(start_days)
+    end_year, end_mon, end_day, _ = _civil_from_days(end_days)
 
-    start_month = months[start_dt.month - 1]
-    end_month = months[end_dt.month - 1]
+    start_month = _MONTHS[start_mon - 1]
+    end_month = _MONTHS[end_mon - 1]
 
     # Same day
-    if start_dt.date() == end_dt.date():
-        return f"{start_month} {start_dt.day}, {start_dt.year}"
+    if start_days == end_days:
+        return f"{start_month} {start_day}, {start_year}"
 
     # Same month and year
-    if start_dt.year == end_dt.year and start_dt.month == end_dt.month:
-        return f"{start_month} {start_dt.day}\u2013{end_dt.day}, {start_dt.year}"
+    if start_year == end_year and start_mon == end_mon:
+        return f"{start_month} {start_day}\u2013{end_day}, {start_year}"
 
     # Same year
-    if start_dt.year == end_dt.year:
-        return f"{start_month} {start_dt.day} \u2013 {end_month} {end_dt.day}, {start_dt.year}"
+    if start_year == end_year:
+        return f"{start_month} {start_day} \u2013 {end_month} {end_day}, {start_year}"
 
     # Different years
-    return f"{start_month} {start_dt.day}, {start_dt.year} \u2013 {end_month} {end_dt.day}, {end_dt.year}"
+    return f"{start_month} {start_day}, {start_year} \u2013 {end_month} {end_day}, {end_year}"
 
 
 # ============================================================
 # BRAINFUCK INTERPRETER
 # ============================================================
 
-def bf_interpret(code: str, input_data: str = "", cell_bits: int = 32, max_steps: int = 10000000) -> str:
+# Cells allocated up front when the tape is allowed to grow
+BF_GROW_INITIAL_SIZE = bf.GROW_INITIAL_SIZE
+
+
+def bf_interpret(code: str, input_data: str = "", cell_bits: int = bf.DEFAULT_CELL_BITS,
+                 max_steps: Optional[int] = bf.DEFAULT_MAX_STEPS,
+                 tape_size: int = bf.DEFAULT_TAPE_SIZE, bounds: str = "wrap",
+                 backend: str = "ir") -> str:
     """
     Interpret Brainfuck code.
 
+    Runs on the bf.py engine, so the result is the same as bf.interpret().
+
     Args:
         code: Brainfuck source code
         input_data: Input string
         cell_bits: Bits per cell (32 for timestamp arithmetic)
-        max_steps: Maximum operations before timeout
+        max_steps: Maximum operations before timeout, or None for no limit
+        tape_size: Number of cells (ignored when bounds is "grow")
+        bounds: What happens when the pointer leaves the tape: "wrap" to the
+            other end, "grow" the tape (starting from BF_GROW_INITIAL_SIZE
+            cells, with no upper limit) or raise an "error"
+        backend: One of bf.BACKENDS: "ir" (optimized), "python"
+            (transpiled) or "reference" (unoptimized)
 
     Returns:
         Output string
-    """
-    # Filter to BF commands only
-    code = ''.join(c for c in code if c in '><+-.,[]')
-
-    # Build jump table
-    jumps = {}
-    stack = []
-    for i, c in enumerate(code):
-        if c == '[':
-            stack.append(i)
-        elif c == ']':
-            if stack:
-                j = stack.pop()
-                jumps[j] = i
-                jumps[i] = j
-
-    # Execute
-    tape = [0] * 30000
-    cell_max = (1 << cell_bits) - 1
-    ptr = 0
-    pc = 0
-    input_ptr = 0
-    output = []
-    steps = 0
-
-    while pc < len(code) and steps < max_steps:
-        steps += 1
-        cmd = code[pc]
-
-        if cmd == '>':
-            ptr = (ptr + 1) % 30000
-        elif cmd == '<':
-            ptr = (ptr - 1) % 30000
-        elif cmd == '+':
-            tape[ptr] = (tape[ptr] + 1) & cell_max
-        elif cmd == '-':
-            tape[ptr] = (tape[ptr] - 1) & cell_max
-        elif cmd == '.':
-            output.append(chr(tape[ptr] & 0xFF))
-        elif cmd == ',':
-            if input_ptr < len(input_data):
-                tape[ptr] = ord(input_data[input_ptr])
-                input_ptr += 1
-            else:
-                tape[ptr] = 0
-        elif cmd == '[':
-            if tape[ptr] == 0:
-                pc = jumps.get(pc, pc)
-        elif cmd == ']':
-            if tape[ptr] != 0:
-                pc = jumps.get(pc, pc)
-
-        pc += 1
 
-    return ''.join(output)
+    Raises:
+        ValueError: If brackets are unmatched, or bounds or backend is unknown
+        RuntimeError: If max_steps is exceeded, or bounds is "error" and the
+            pointer leaves the tape
+    """
+    return bf.interpret(code, input_data, cell_bits, tape_size, max_steps,
+                        backend=backend, bounds=bounds)
 
 
 # ============================================================
@@ -26,11 +26,9 @@ except ImportError:
     print("Error: openpyxl required. Install with: pip install openpyxl")
     sys.exit(1)
 
-try:
-    import yaml
-except ImportError:
-    print("Error: pyyaml required. Install with: pip install pyyaml")
-    sys.exit(1)
+# tests.yaml is parsed through the shared loader at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import spec_corpus  # noqa: E402
 
 
 # LAMBDA formula definitions
@@ -277,10 +275,12 @@ LAMBDA_FORMULAS = {
 
 
 def load_tests(tests_yaml_path):
-    """Load tests from tests.yaml file."""
-    with open(tests_yaml_path, 'r') as f:
-        data = yaml.safe_load(f)
-    return data
+    """Load tests from tests.yaml file (from its cached fixture when up to date)."""
+    try:
+        return spec_corpus.load_spec(tests_yaml_path)
+    except ImportError:
+        print("Error: pyyaml required. Install with: pip install pyyaml")
+        sys.exit(1)
 
 
 def create_workbook(tests_data, output_path):
@@ -589,7 +589,7 @@ def main():
     args = parser.parse_args()
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    tests_yaml_path = os.path.join(script_dir, '..', '..', 'tests.yaml')
+    tests_yaml_path = spec_corpus.SPEC_PATH
     output_path = os.path.join(script_dir, 'test_whenwords.xlsx')
 
     # Load tests
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for parse_duration.
+
+Times the compiled single-pass parser in whenwords.py against the previous
+multi-pass implementation (kept below for comparison) over the inputs used
+by test_whenwords.py.
+
+Usage:
+    python bench_parse_duration.py
+    python bench_parse_duration.py --number 20000
+"""
+
+import argparse
+import re
+import timeit
+
+from whenwords import parse_duration
+
+# parse_duration inputs from test_whenwords.py that return a value
+INPUTS = [
+    "45s", "45sec", "90m", "90min", "2hr", "2hrs", "2d", "1w",
+    "2h30m", "2h 30m", "2h, 30m", "1d 2h 30m", "2 hours 30 minutes",
+    "2 hours and 30 minutes", "2 hours, and 30 minutes",
+    "1 day, 2 hours, and 30 minutes", "45 seconds", "90 minutes", "2 days",
+    "1 week", "2.5 hours", "1.5h", "2:30", "1:30:00", "0:05:30", "30mins",
+    "2H 30M", "  2 hours   30 minutes  ",
+]
+
+# Inputs that raise; the parser must reject them with the same message
+ERROR_INPUTS = [
+    "", "   ", "-5 minutes", "hello world", "42", "5 and and hours",
+    "2 hours and", "3 fortnights", "1h 2x", "and 5h", "5 andhours",
+]
+
+
+def legacy_parse_duration(s):
+    """parse_duration as implemented before the single-pass parser."""
+    if not s or not s.strip():
+        raise ValueError("Empty duration string")
+
+    s = s.strip()
+    original = s
+
+    if s.startswith('-'):
+        raise ValueError("Negative durations are not allowed")
+
+    unit_map = {
+        's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
+        'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+        'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
+        'd': 86400, 'day': 86400, 'days': 86400,
+        'w': 604800, 'wk': 604800, 'wks': 604800, 'week': 604800, 'weeks': 604800,
+    }
+
+    colon_match = re.match(r'^(\d+):(\d{1,2})(?::(\d{1,2}))?$', s)
+    if colon_match:
+        hours = int(colon_match.group(1))
+        minutes = int(colon_match.group(2))
+        seconds = int(colon_match.group(3)) if colon_match.group(3) else 0
+        return hours * 3600 + minutes * 60 + seconds
+
+    s = s.lower()
+    s = s.replace(',', ' ').replace(' and ', ' ')
+    s = ' '.join(s.split())
+
+    matches = re.findall(r'(\d+(?:\.\d+)?)\s*([a-z]+)', s)
+    if not matches:
+        raise ValueError(f"Cannot parse duration: {original}")
+
+    total_seconds = 0.0
+    for value_str, unit in matches:
+        if unit not in unit_map:
+            raise ValueError(f"Unknown unit: {unit}")
+        total_seconds += float(value_str) * unit_map[unit]
+
+    return int(total_seconds)
+
+
+def outcome(func, s):
+    """Return value, or the exception type and message, of func(s)."""
+    try:
+        return func(s)
+    except ValueError as e:
+        return type(e), str(e)
+
+
+def bench(func, number, repeat):
+    """Return the best time per call in nanoseconds over all inputs."""
+    def run():
+        for s in INPUTS:
+            func(s)
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return best / (number * len(INPUTS)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000, help="loops per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats (best is kept)")
+    args = parser.parse_args()
+
+    for s in INPUTS + ERROR_INPUTS:
+        assert outcome(parse_duration, s) == outcome(legacy_parse_duration, s), s
+
+    legacy = bench(legacy_parse_duration, args.number, args.repeat)
+    current = bench(parse_duration, args.number, args.repeat)
+    print(f"legacy parse_duration:   {legacy:8.0f} ns/call")
+    print(f"compiled parse_duration: {current:8.0f} ns/call")
+    print(f"speedup:                 {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
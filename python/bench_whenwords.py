@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the five whenwords functions across implementations.
+
+Times timeago, duration, parse_duration, human_date and date_range in
+python/whenwords.py and brainfuck-py/whenwords_lib.py over the spec cases
+in tests.yaml (the cases test_whenwords.py checks, minus the ones that
+raise) and over a large set of random inputs. Reports nanoseconds per call
+and the peak memory a single call allocates, as measured by tracemalloc.
+
+human_date and date_range in python/whenwords.py memoize results per day
+pair. Their "python" rows clear those caches before every timed pass and
+every measured call, so they show the per-call cost; "python+cache" rows
+show the same calls with the caches warm.
+
+Usage:
+    python bench_whenwords.py
+    python bench_whenwords.py --function parse_duration --random 50000
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+import whenwords
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import spec_corpus  # noqa: E402
+
+FUNCTIONS = spec_corpus.FUNCTIONS
+
+# Reference time for random inputs: 2024-01-15 00:00:00 UTC
+REFERENCE = 1705276800
+
+YEAR = 365 * 86400
+
+# Result caches of python/whenwords.py functions, cleared for uncached rows
+CACHES = {
+    'human_date': whenwords._HUMAN_DATE_CACHE,
+    'date_range': whenwords._DATE_RANGE_CACHE,
+}
+
+UNITS = ['s', 'sec', 'm', 'min', 'mins', 'h', 'hr', 'hrs', 'd', 'day', 'days', 'w', 'week',
+         'seconds', 'minutes', 'hours', 'weeks']
+
+
+def load_brainfuck_lib():
+    """Import brainfuck-py/whenwords_lib.py, which imports bf from its own directory."""
+    directory = os.path.join(ROOT, 'brainfuck-py')
+    sys.path.insert(0, directory)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            'brainfuck_whenwords', os.path.join(directory, 'whenwords_lib.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(directory)
+    return module
+
+
+def spec_cases():
+    """Argument tuples of every tests.yaml case that does not raise, by function."""
+    try:
+        corpus = spec_corpus.cases()
+    except ImportError:
+        raise SystemExit("Error: pyyaml required for the spec cases. "
+                         "Install with: pip install pyyaml, or pass --no-spec")
+    cases = {function: [] for function in FUNCTIONS}
+    for case in corpus:
+        if not case.error:
+            cases[case.function].append(case.args)
+    return cases
+
+
+def random_duration_string(rng):
+    """A parse_duration input in one of the accepted formats."""
+    kind = rng.random()
+    if kind < 0.15:
+        return f"{rng.randrange(100)}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+    if kind < 0.25:
+        return f"{rng.randrange(1, 100)}.{rng.randrange(10)} {rng.choice(UNITS)}"
+    parts = [f"{rng.randrange(1, 1000)}{rng.choice(['', ' '])}{rng.choice(UNITS)}"
+             for _ in range(rng.randrange(1, 4))]
+    return rng.choice([' ', ', ', ' and ']).join(parts)
+
+
+def random_cases(count, seed):
+    """count random argument tuples per function, reproducible from seed."""
+    rng = random.Random(seed)
+
+    def timestamp():
+        return REFERENCE + rng.randrange(-10 * YEAR, 10 * YEAR)
+
+    def options():
+        return rng.choice([None, {'compact': True}, {'max_units': rng.randrange(1, 5)}])
+
+    return {
+        'timeago': [(timestamp(), REFERENCE) for _ in range(count)],
+        'duration': [(rng.randrange(10 ** rng.randrange(1, 10)), options()) for _ in range(count)],
+        'parse_duration': [(random_duration_string(rng),) for _ in range(count)],
+        'human_date': [(timestamp(), REFERENCE) for _ in range(count)],
+        'date_range': [(timestamp(), timestamp()) for _ in range(count)],
+    }
+
+
+def bench(func, cases, number, repeat, reset=None):
+    """
+    Best time per call in nanoseconds over all cases.
+
+    If reset is given it is called, untimed, before every pass over cases.
+    """
+    def run():
+        for args in cases:
+            func(*args)
+    if reset is None:
+        best = min(timeit.repeat(run, number=number, repeat=repeat))
+    else:
+        best = min(sum(timeit.repeat(run, setup=reset, number=1, repeat=number))
+                   for _ in range(repeat))
+    return best / (number * len(cases)) * 1e9
+
+
+def peak_per_call(func, cases, reset=None):
+    """Mean peak bytes allocated while a single call runs, calling reset before each."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for args in cases:
+            if reset is not None:
+                reset()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(cases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--function", action="append", choices=FUNCTIONS,
+                        help="function to time (repeatable; default: all)")
+    parser.add_argument("--number", type=int, default=200,
+                        help="passes over the spec cases per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats (best is kept)")
+    parser.add_argument("--random", type=int, default=10000, metavar="N",
+                        help="random inputs per function (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random inputs")
+    parser.add_argument("--no-spec", action="store_true", help="skip the tests.yaml cases")
+    args = parser.parse_args()
+
+    brainfuck = load_brainfuck_lib()
+    corpora = []
+    if not args.no_spec:
+        corpora.append(('spec', spec_cases(), args.number))
+    if args.random:
+        # Each repeat makes a single pass over the random inputs
+        corpora.append(('random', random_cases(args.random, args.seed), 1))
+
+    print(f"{'function':<15} {'implementation':<14} {'inputs':<7} {'cases':>6} "
+          f"{'ns/call':>9} {'peak B/call':>12}")
+    for function in args.function or FUNCTIONS:
+        for corpus, cases, number in corpora:
+            cache = CACHES.get(function)
+            rows = [('python', getattr(whenwords, function), cache and cache.clear)]
+            if cache is not None:
+                rows.append(('python+cache', rows[0][1], None))
+            rows.append(('brainfuck-py', getattr(brainfuck, function), None))
+            for name, func, reset in rows:
+                valid = []
+                for case in cases[function]:
+                    try:
+                        func(*case)
+                    except ValueError:
+                        continue
+                    valid.append(case)
+                ns = bench(func, valid, number, args.repeat, reset)
+                peak = peak_per_call(func, valid, reset)
+                print(f"{function:<15} {name:<14} {corpus:<7} {len(valid):>6} "
+                      f"{ns:>9.0f} {peak:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
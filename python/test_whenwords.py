@@ -1,641 +1,492 @@
 """
-Tests for whenwords library - generated from tests.yaml
-"""
-
-import pytest
-from whenwords import timeago, duration, parse_duration, human_date, date_range
-
-
-# ============================================================================
-# timeago tests
-# ============================================================================
-
-def test_timeago_just_now_identical_timestamps():
-    result = timeago(1704067200, reference=1704067200)
-    assert result == "just now"
-
-
-def test_timeago_just_now_30_seconds_ago():
-    result = timeago(1704067170, reference=1704067200)
-    assert result == "just now"
-
-
-def test_timeago_just_now_44_seconds_ago():
-    result = timeago(1704067156, reference=1704067200)
-    assert result == "just now"
-
-
-def test_timeago_1_minute_ago_45_seconds():
-    result = timeago(1704067155, reference=1704067200)
-    assert result == "1 minute ago"
-
-
-def test_timeago_1_minute_ago_89_seconds():
-    result = timeago(1704067111, reference=1704067200)
-    assert result == "1 minute ago"
-
-
-def test_timeago_2_minutes_ago_90_seconds():
-    result = timeago(1704067110, reference=1704067200)
-    assert result == "2 minutes ago"
-
-
-def test_timeago_30_minutes_ago():
-    result = timeago(1704065400, reference=1704067200)
-    assert result == "30 minutes ago"
-
-
-def test_timeago_44_minutes_ago():
-    result = timeago(1704064560, reference=1704067200)
-    assert result == "44 minutes ago"
-
-
-def test_timeago_1_hour_ago_45_minutes():
-    result = timeago(1704064500, reference=1704067200)
-    assert result == "1 hour ago"
-
-
-def test_timeago_1_hour_ago_89_minutes():
-    result = timeago(1704061860, reference=1704067200)
-    assert result == "1 hour ago"
-
-
-def test_timeago_2_hours_ago_90_minutes():
-    result = timeago(1704061800, reference=1704067200)
-    assert result == "2 hours ago"
-
-
-def test_timeago_5_hours_ago():
-    result = timeago(1704049200, reference=1704067200)
-    assert result == "5 hours ago"
-
-
-def test_timeago_21_hours_ago():
-    result = timeago(1703991600, reference=1704067200)
-    assert result == "21 hours ago"
-
-
-def test_timeago_1_day_ago_22_hours():
-    result = timeago(1703988000, reference=1704067200)
-    assert result == "1 day ago"
-
-
-def test_timeago_1_day_ago_35_hours():
-    result = timeago(1703941200, reference=1704067200)
-    assert result == "1 day ago"
-
-
-def test_timeago_2_days_ago_36_hours():
-    result = timeago(1703937600, reference=1704067200)
-    assert result == "2 days ago"
-
-
-def test_timeago_7_days_ago():
-    result = timeago(1703462400, reference=1704067200)
-    assert result == "7 days ago"
-
-
-def test_timeago_25_days_ago():
-    result = timeago(1701907200, reference=1704067200)
-    assert result == "25 days ago"
-
-
-def test_timeago_1_month_ago_26_days():
-    result = timeago(1701820800, reference=1704067200)
-    assert result == "1 month ago"
-
-
-def test_timeago_1_month_ago_45_days():
-    result = timeago(1700179200, reference=1704067200)
-    assert result == "1 month ago"
-
+Tests for whenwords library
 
-def test_timeago_2_months_ago_46_days():
-    result = timeago(1700092800, reference=1704067200)
-    assert result == "2 months ago"
-
-
-def test_timeago_6_months_ago():
-    result = timeago(1688169600, reference=1704067200)
-    assert result == "6 months ago"
-
-
-def test_timeago_10_months_ago_319_days():
-    result = timeago(1676505600, reference=1704067200)
-    assert result == "10 months ago"
-
-
-def test_timeago_1_year_ago_320_days():
-    result = timeago(1676419200, reference=1704067200)
-    assert result == "1 year ago"
-
-
-def test_timeago_1_year_ago_547_days():
-    result = timeago(1656806400, reference=1704067200)
-    assert result == "1 year ago"
-
-
-def test_timeago_2_years_ago_548_days():
-    result = timeago(1656720000, reference=1704067200)
-    assert result == "2 years ago"
-
-
-def test_timeago_5_years_ago():
-    result = timeago(1546300800, reference=1704067200)
-    assert result == "5 years ago"
-
-
-def test_timeago_future_in_just_now_30_seconds():
-    result = timeago(1704067230, reference=1704067200)
-    assert result == "just now"
-
-
-def test_timeago_future_in_1_minute():
-    result = timeago(1704067260, reference=1704067200)
-    assert result == "in 1 minute"
-
-
-def test_timeago_future_in_5_minutes():
-    result = timeago(1704067500, reference=1704067200)
-    assert result == "in 5 minutes"
-
-
-def test_timeago_future_in_1_hour():
-    result = timeago(1704070200, reference=1704067200)
-    assert result == "in 1 hour"
-
-
-def test_timeago_future_in_3_hours():
-    result = timeago(1704078000, reference=1704067200)
-    assert result == "in 3 hours"
-
-
-def test_timeago_future_in_1_day():
-    result = timeago(1704150000, reference=1704067200)
-    assert result == "in 1 day"
-
-
-def test_timeago_future_in_2_days():
-    result = timeago(1704240000, reference=1704067200)
-    assert result == "in 2 days"
+test_spec_case runs every case of tests.yaml itself through the shared
+spec_corpus loader, so it cannot drift from the specification; the rest
+cover behaviour tests.yaml does not specify.
+"""
 
+import io
+import os
+import random
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timezone
 
-def test_timeago_future_in_1_month():
-    result = timeago(1706745600, reference=1704067200)
-    assert result == "in 1 month"
+import pytest
+import whenwords
+from whenwords import (
+    timeago, duration, parse_duration, human_date, date_range, timeago_batch,
+    ParseDurationCache, CacheInfo, timeago_codes, format_column_file, main,
+    _civil_from_days,
+)
+from whenwords_parallel import parallel_map
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import spec_corpus  # noqa: E402
 
-def test_timeago_future_in_1_year():
-    result = timeago(1735689600, reference=1704067200)
-    assert result == "in 1 year"
+try:
+    SPEC_CASES = spec_corpus.cases()
+except ImportError:
+    # No valid fixture and no PyYAML: the corpus tests are skipped
+    SPEC_CASES = []
 
 
 # ============================================================================
-# duration tests
+# tests.yaml corpus
 # ============================================================================
 
-def test_duration_zero_seconds():
-    result = duration(0)
-    assert result == "0 seconds"
-
-
-def test_duration_1_second():
-    result = duration(1)
-    assert result == "1 second"
-
-
-def test_duration_45_seconds():
-    result = duration(45)
-    assert result == "45 seconds"
-
-
-def test_duration_1_minute():
-    result = duration(60)
-    assert result == "1 minute"
-
-
-def test_duration_1_minute_30_seconds():
-    result = duration(90)
-    assert result == "1 minute, 30 seconds"
+@pytest.mark.parametrize("case", SPEC_CASES, ids=lambda case: f"{case.function}: {case.name}")
+def test_spec_case(case):
+    func = getattr(whenwords, case.function)
+    if case.error:
+        with pytest.raises(ValueError):
+            func(*case.args)
+    else:
+        assert func(*case.args) == case.output
 
 
-def test_duration_2_minutes():
-    result = duration(120)
-    assert result == "2 minutes"
+def test_spec_corpus_covers_every_function():
+    if not SPEC_CASES:
+        pytest.importorskip("yaml")
+    assert {case.function for case in SPEC_CASES} == set(spec_corpus.FUNCTIONS)
 
 
-def test_duration_1_hour():
-    result = duration(3600)
-    assert result == "1 hour"
+def test_spec_fixture_follows_yaml_edits(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "tests.yaml"
+    path.write_text('parse_duration:\n  - name: "one"\n    input: "1h"\n    output: 3600\n')
+    assert spec_corpus.cases("parse_duration", str(path))[0].output == 3600
+    assert os.path.exists(spec_corpus.fixture_path(str(path)))
 
+    path.write_text('parse_duration:\n  - name: "two"\n    input: "2h"\n    output: 7200\n')
+    assert spec_corpus.cases("parse_duration", str(path)) == [
+        spec_corpus.Case("parse_duration", "two", ("2h",), 7200, False)]
 
-def test_duration_1_hour_1_minute():
-    result = duration(3661)
-    assert result == "1 hour, 1 minute"
 
+def test_spec_fixture_is_used_without_reparsing(tmp_path, monkeypatch):
+    pytest.importorskip("yaml")
+    path = tmp_path / "tests.yaml"
+    path.write_text('parse_duration:\n  - name: "bad"\n    input: ""\n    error: true\n')
+    expected = spec_corpus.cases("parse_duration", str(path))
+    spec_corpus._loaded.clear()
+    monkeypatch.setitem(sys.modules, "yaml", None)  # any reparse would fail to import
+    assert spec_corpus.cases("parse_duration", str(path)) == expected
 
-def test_duration_1_hour_30_minutes():
-    result = duration(5400)
-    assert result == "1 hour, 30 minutes"
-
-
-def test_duration_2_hours_30_minutes():
-    result = duration(9000)
-    assert result == "2 hours, 30 minutes"
-
-
-def test_duration_1_day():
-    result = duration(86400)
-    assert result == "1 day"
 
+# ============================================================================
+# timeago_batch tests
+# ============================================================================
 
-def test_duration_1_day_2_hours():
-    result = duration(93600)
-    assert result == "1 day, 2 hours"
+TIMEAGO_BATCH_REFERENCE = 1704067200
+TIMEAGO_BATCH_CASES = [
+    1704067200, 1704067170, 1704067156, 1704067155, 1704067111, 1704067110,
+    1704065400, 1704064560, 1704064500, 1704061860, 1704049200, 1703991600,
+    1703980800, 1703462400, 1701820800, 1701475200, 1696809600, 1675209600,
+    1672531200, 1656547200, 1641081600, 1546300800, 1704067230, 1704067500,
+    1704070200, 1704078000, 1704150000, 1704672000, 1707436800, 1735689600,
+    1704067200.4, 1704067154.5, 946684800, 2000000000,
+]
 
 
-def test_duration_7_days():
-    result = duration(604800)
-    assert result == "7 days"
+def test_timeago_batch_matches_scalar():
+    expected = [timeago(t, reference=TIMEAGO_BATCH_REFERENCE) for t in TIMEAGO_BATCH_CASES]
+    assert timeago_batch(TIMEAGO_BATCH_CASES, TIMEAGO_BATCH_REFERENCE) == expected
 
 
-def test_duration_1_month_30_days():
-    result = duration(2592000)
-    assert result == "1 month"
+def test_timeago_batch_accepts_buffer():
+    ints = [int(t) for t in TIMEAGO_BATCH_CASES]
+    expected = [timeago(t, reference=TIMEAGO_BATCH_REFERENCE) for t in ints]
+    assert timeago_batch(array('q', ints), TIMEAGO_BATCH_REFERENCE) == expected
 
 
-def test_duration_1_year_365_days():
-    result = duration(31536000)
-    assert result == "1 year"
+def test_timeago_batch_empty():
+    assert timeago_batch([], TIMEAGO_BATCH_REFERENCE) == []
 
 
-def test_duration_1_year_2_months():
-    result = duration(36720000)
-    assert result == "1 year, 2 months"
+def test_timeago_batch_error_nan():
+    with pytest.raises(ValueError):
+        timeago_batch([1704067200, float('nan')], TIMEAGO_BATCH_REFERENCE)
 
 
-def test_duration_compact_1h_1m():
-    result = duration(3661, options={"compact": True})
-    assert result == "1h 1m"
+def test_timeago_batch_numpy_matches_scalar():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    ts = TIMEAGO_BATCH_REFERENCE + rng.integers(-10**9, 10**9, 5000)
+    expected = [timeago(int(t), reference=TIMEAGO_BATCH_REFERENCE) for t in ts]
+    assert timeago_batch(ts, TIMEAGO_BATCH_REFERENCE) == expected
+    assert timeago_batch(ts.astype(np.float64), TIMEAGO_BATCH_REFERENCE) == expected
 
 
-def test_duration_compact_2h_30m():
-    result = duration(9000, options={"compact": True})
-    assert result == "2h 30m"
+def test_timeago_returns_shared_label_objects():
+    first = timeago(1704049200, reference=1704067200)
+    second = timeago(1704049100, reference=1704067100)
+    assert first == "5 hours ago"
+    assert first is second
+    assert timeago_batch([1704049200], 1704067200)[0] is first
 
 
-def test_duration_compact_1d_2h():
-    result = duration(93600, options={"compact": True})
-    assert result == "1d 2h"
+def test_timeago_labels_beyond_table():
+    assert timeago(0, reference=400 * 365 * 86400) == "400 years ago"
 
 
-def test_duration_compact_45s():
-    result = duration(45, options={"compact": True})
-    assert result == "45s"
+# ============================================================================
+# parse_duration tests beyond tests.yaml
+# ============================================================================
 
+@pytest.mark.parametrize("text, message", [
+    ("5 and and hours", "Unknown unit: and"),
+    ("1h 2x", "Unknown unit: x"),
+    ("hello world", "Cannot parse duration: hello world"),
+])
+def test_parse_duration_error_messages(text, message):
+    with pytest.raises(ValueError, match=f"^{message}$"):
+        parse_duration(text)
 
-def test_duration_compact_0s():
-    result = duration(0, options={"compact": True})
-    assert result == "0s"
 
+# ============================================================================
+# ParseDurationCache tests
+# ============================================================================
 
-def test_duration_max_units_1_hours_only():
-    result = duration(3661, options={"max_units": 1})
-    assert result == "1 hour"
+def test_parse_duration_cache_hits_and_misses():
+    parse = ParseDurationCache(maxsize=8)
+    assert parse("2h30m") == 9000
+    assert parse("2h30m") == 9000
+    assert parse("90m") == 5400
+    assert parse.cache_info() == CacheInfo(hits=1, misses=2, evictions=0, maxsize=8, currsize=2)
 
 
-def test_duration_max_units_1_days_only():
-    result = duration(93600, options={"max_units": 1})
-    assert result == "1 day"
+def test_parse_duration_cache_evicts_least_recently_used():
+    parse = ParseDurationCache(maxsize=2)
+    parse("30s")
+    parse("5m")
+    parse("30s")
+    parse("1h")  # evicts "5m"
+    parse("30s")
+    assert parse.cache_info() == CacheInfo(hits=2, misses=3, evictions=1, maxsize=2, currsize=2)
+    parse("5m")
+    assert parse.cache_info().misses == 4
 
 
-def test_duration_max_units_3():
-    result = duration(93661, options={"max_units": 3})
-    assert result == "1 day, 2 hours, 1 minute"
+def test_parse_duration_cache_does_not_cache_errors():
+    parse = ParseDurationCache()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            parse("hello world")
+    assert parse.cache_info().currsize == 0
 
 
-def test_duration_compact_max_units_1():
-    result = duration(9000, options={"compact": True, "max_units": 1})
-    assert result == "2h"
+def test_parse_duration_cache_clear():
+    parse = ParseDurationCache()
+    parse("1w")
+    parse.cache_clear()
+    assert parse.cache_info() == CacheInfo(hits=0, misses=0, evictions=0, maxsize=256, currsize=0)
 
 
-def test_duration_error_negative_seconds():
+def test_parse_duration_cache_error_invalid_size():
     with pytest.raises(ValueError):
-        duration(-100)
+        ParseDurationCache(maxsize=0)
 
 
 # ============================================================================
-# parse_duration tests
+# calendar-day cache tests
 # ============================================================================
 
-def test_parse_duration_compact_hours_minutes():
-    result = parse_duration("2h30m")
-    assert result == 9000
+def test_human_date_cache_is_keyed_by_day():
+    whenwords._HUMAN_DATE_CACHE.clear()
+    assert human_date(1705276800, reference=1705276800) == "Today"
+    assert human_date(1705320000, reference=1705363199) == "Today"
+    assert whenwords._HUMAN_DATE_CACHE.info().hits == 1
 
 
-def test_parse_duration_compact_with_space():
-    result = parse_duration("2h 30m")
-    assert result == 9000
+def test_date_range_cache_is_keyed_by_day():
+    whenwords._DATE_RANGE_CACHE.clear()
+    assert date_range(1705276800, 1705881600) == "January 15–22, 2024"
+    assert date_range(1705917600, 1705320000) == "January 15–22, 2024"
+    assert whenwords._DATE_RANGE_CACHE.info().hits == 1
 
 
-def test_parse_duration_compact_with_comma():
-    result = parse_duration("2h, 30m")
-    assert result == 9000
-
-
-def test_parse_duration_verbose():
-    result = parse_duration("2 hours 30 minutes")
-    assert result == 9000
-
-
-def test_parse_duration_verbose_with_and():
-    result = parse_duration("2 hours and 30 minutes")
-    assert result == 9000
-
-
-def test_parse_duration_verbose_with_comma_and():
-    result = parse_duration("2 hours, and 30 minutes")
-    assert result == 9000
-
-
-def test_parse_duration_decimal_hours():
-    result = parse_duration("2.5 hours")
-    assert result == 9000
-
-
-def test_parse_duration_decimal_compact():
-    result = parse_duration("1.5h")
-    assert result == 5400
-
-
-def test_parse_duration_single_unit_minutes_verbose():
-    result = parse_duration("90 minutes")
-    assert result == 5400
-
-
-def test_parse_duration_single_unit_minutes_compact():
-    result = parse_duration("90m")
-    assert result == 5400
-
-
-def test_parse_duration_single_unit_min():
-    result = parse_duration("90min")
-    assert result == 5400
-
-
-def test_parse_duration_colon_notation_h_mm():
-    result = parse_duration("2:30")
-    assert result == 9000
-
-
-def test_parse_duration_colon_notation_h_mm_ss():
-    result = parse_duration("1:30:00")
-    assert result == 5400
-
-
-def test_parse_duration_colon_notation_with_seconds():
-    result = parse_duration("0:05:30")
-    assert result == 330
-
-
-def test_parse_duration_days_verbose():
-    result = parse_duration("2 days")
-    assert result == 172800
-
-
-def test_parse_duration_days_compact():
-    result = parse_duration("2d")
-    assert result == 172800
-
-
-def test_parse_duration_weeks_verbose():
-    result = parse_duration("1 week")
-    assert result == 604800
-
-
-def test_parse_duration_weeks_compact():
-    result = parse_duration("1w")
-    assert result == 604800
-
-
-def test_parse_duration_mixed_verbose():
-    result = parse_duration("1 day, 2 hours, and 30 minutes")
-    assert result == 95400
-
-
-def test_parse_duration_mixed_compact():
-    result = parse_duration("1d 2h 30m")
-    assert result == 95400
-
-
-def test_parse_duration_seconds_only_verbose():
-    result = parse_duration("45 seconds")
-    assert result == 45
-
-
-def test_parse_duration_seconds_compact_s():
-    result = parse_duration("45s")
-    assert result == 45
-
-
-def test_parse_duration_seconds_compact_sec():
-    result = parse_duration("45sec")
-    assert result == 45
-
-
-def test_parse_duration_hours_hr():
-    result = parse_duration("2hr")
-    assert result == 7200
-
-
-def test_parse_duration_hours_hrs():
-    result = parse_duration("2hrs")
-    assert result == 7200
-
-
-def test_parse_duration_minutes_mins():
-    result = parse_duration("30mins")
-    assert result == 1800
-
-
-def test_parse_duration_case_insensitive():
-    result = parse_duration("2H 30M")
-    assert result == 9000
-
-
-def test_parse_duration_whitespace_tolerance():
-    result = parse_duration("  2 hours   30 minutes  ")
-    assert result == 9000
-
+# ============================================================================
+# civil date differential tests (integer path vs datetime)
+# ============================================================================
 
-def test_parse_duration_error_empty_string():
+def _datetime_human_date(ts, ref):
+    ts_dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    ref_dt = datetime.fromtimestamp(ref, tz=timezone.utc)
+    day_diff = (ts_dt.date() - ref_dt.date()).days
+    if day_diff == 0:
+        return "Today"
+    if day_diff == -1:
+        return "Yesterday"
+    if day_diff == 1:
+        return "Tomorrow"
+    if -7 < day_diff < 0:
+        return ts_dt.strftime("Last %A")
+    if 0 < day_diff < 7:
+        return ts_dt.strftime("This %A")
+    if ts_dt.year == ref_dt.year:
+        return f"{ts_dt:%B} {ts_dt.day}"
+    return f"{ts_dt:%B} {ts_dt.day}, {ts_dt.year}"
+
+
+def _datetime_date_range(start, end):
+    start, end = sorted((start, end))
+    s = datetime.fromtimestamp(start, tz=timezone.utc)
+    e = datetime.fromtimestamp(end, tz=timezone.utc)
+    if s.date() == e.date():
+        return f"{s:%B} {s.day}, {s.year}"
+    if (s.year, s.month) == (e.year, e.month):
+        return f"{s:%B} {s.day}–{e.day}, {s.year}"
+    if s.year == e.year:
+        return f"{s:%B} {s.day} – {e:%B} {e.day}, {s.year}"
+    return f"{s:%B} {s.day}, {s.year} – {e:%B} {e.day}, {e.year}"
+
+
+def test_civil_from_days_matches_datetime():
+    epoch = date(1970, 1, 1).toordinal()
+    for days in list(range(-80000, 80000)) + list(range(-719162, 2932897, 997)):
+        d = date.fromordinal(epoch + days)
+        assert _civil_from_days(days) == (d.year, d.month, d.day, d.weekday())
+
+
+def test_human_date_and_date_range_match_datetime_path():
+    rng = random.Random(6)
+    for _ in range(20000):
+        ts = rng.randint(-62135596800, 253402214400)
+        ref = ts + rng.choice([0, 1, 86400, 7 * 86400, 400 * 86400]) * rng.randint(-3, 3) + rng.randint(-86400, 86400)
+        ref = min(max(ref, -62135596800), 253402300799)
+        assert human_date(ts, reference=ref) == _datetime_human_date(ts, ref)
+        assert date_range(ts, ref) == _datetime_date_range(ts, ref)
+
+
+# First and last second of years 1-9999, and one second beyond each
+FIRST_SECOND, LAST_SECOND = -62135596800, 253402300799
+
+
+def test_human_date_and_date_range_accept_years_1_to_9999():
+    assert human_date(FIRST_SECOND, reference=0) == "January 1, 1"
+    assert human_date(LAST_SECOND, reference=0) == "December 31, 9999"
+    assert date_range(FIRST_SECOND, LAST_SECOND) == "January 1, 1 \u2013 December 31, 9999"
+
+
+@pytest.mark.parametrize("timestamp", [FIRST_SECOND - 1, LAST_SECOND + 1, -1e14])
+def test_human_date_and_date_range_reject_years_outside_1_to_9999(timestamp):
     with pytest.raises(ValueError):
-        parse_duration("")
-
-
-def test_parse_duration_error_no_units():
+        human_date(timestamp, reference=0)
     with pytest.raises(ValueError):
-        parse_duration("hello world")
-
-
-def test_parse_duration_error_negative():
+        human_date(0, reference=timestamp)
     with pytest.raises(ValueError):
-        parse_duration("-5 hours")
-
-
-def test_parse_duration_error_just_number():
+        date_range(timestamp, 0)
     with pytest.raises(ValueError):
-        parse_duration("42")
+        whenwords.human_date_codes([0, timestamp], 0)
 
 
 # ============================================================================
-# human_date tests
+# command line tests
 # ============================================================================
 
-def test_human_date_today():
-    result = human_date(1705276800, reference=1705276800)
-    assert result == "Today"
-
-
-def test_human_date_today_same_day_different_time():
-    result = human_date(1705320000, reference=1705276800)
-    assert result == "Today"
-
-
-def test_human_date_yesterday():
-    result = human_date(1705190400, reference=1705276800)
-    assert result == "Yesterday"
-
-
-def test_human_date_tomorrow():
-    result = human_date(1705363200, reference=1705276800)
-    assert result == "Tomorrow"
-
-
-def test_human_date_last_sunday_1_day_before_monday():
-    result = human_date(1705190400, reference=1705276800)
-    assert result == "Yesterday"
-
-
-def test_human_date_last_saturday_2_days_ago():
-    result = human_date(1705104000, reference=1705276800)
-    assert result == "Last Saturday"
-
+def run_cli(monkeypatch, capsys, stdin_text, *argv):
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin_text))
+    code = main(list(argv))
+    captured = capsys.readouterr()
+    return code, captured.out, captured.err
 
-def test_human_date_last_friday_3_days_ago():
-    result = human_date(1705017600, reference=1705276800)
-    assert result == "Last Friday"
 
+def test_cli_timeago_lines(monkeypatch, capsys):
+    code, out, _ = run_cli(monkeypatch, capsys, "1704067110\n1704070200\n\n2024-01-01T00:00:00Z\n",
+                           "--reference", "1704067200")
+    assert code == 0
+    assert out == "2 minutes ago\nin 1 hour\n\njust now\n"
 
-def test_human_date_last_thursday_4_days_ago():
-    result = human_date(1704931200, reference=1705276800)
-    assert result == "Last Thursday"
 
+def test_cli_human_date_tsv_field(monkeypatch, capsys):
+    code, out, _ = run_cli(monkeypatch, capsys, "a\t1705190400\nb\t1705276800\n",
+                           "-f", "human_date", "-k", "2", "-r", "1705276800")
+    assert code == 0
+    assert out == "a\t1705190400\tYesterday\nb\t1705276800\tToday\n"
 
-def test_human_date_last_wednesday_5_days_ago():
-    result = human_date(1704844800, reference=1705276800)
-    assert result == "Last Wednesday"
 
+def test_cli_duration_compact(monkeypatch, capsys):
+    code, out, _ = run_cli(monkeypatch, capsys, "3661\n93661", "-f", "duration", "--compact")
+    assert code == 0
+    assert out == "1h 1m\n1d 2h\n"
 
-def test_human_date_last_tuesday_6_days_ago():
-    result = human_date(1704758400, reference=1705276800)
-    assert result == "Last Tuesday"
 
+def test_cli_error_reports_line(monkeypatch, capsys):
+    code, _, err = run_cli(monkeypatch, capsys, "1704067200\nnot a time\n", "-r", "1704067200")
+    assert code == 1
+    assert "line 2" in err
 
-def test_human_date_last_monday_7_days_ago_becomes_date():
-    result = human_date(1704672000, reference=1705276800)
-    assert result == "January 8"
 
+def test_cli_error_keeps_earlier_lines(monkeypatch, capsys):
+    code, out, err = run_cli(monkeypatch, capsys, "100\n200\nbad\n", "-r", "0")
+    assert code == 1
+    assert out == "in 2 minutes\nin 3 minutes\n"
+    assert err.startswith("Error: line 3:")
 
-def test_human_date_this_tuesday_1_day_future():
-    result = human_date(1705363200, reference=1705276800)
-    assert result == "Tomorrow"
 
-
-def test_human_date_this_wednesday_2_days_future():
-    result = human_date(1705449600, reference=1705276800)
-    assert result == "This Wednesday"
-
-
-def test_human_date_this_thursday_3_days_future():
-    result = human_date(1705536000, reference=1705276800)
-    assert result == "This Thursday"
-
-
-def test_human_date_this_sunday_6_days_future():
-    result = human_date(1705795200, reference=1705276800)
-    assert result == "This Sunday"
-
-
-def test_human_date_next_monday_7_days_future_becomes_date():
-    result = human_date(1705881600, reference=1705276800)
-    assert result == "January 22"
-
-
-def test_human_date_same_year_different_month():
-    result = human_date(1709251200, reference=1705276800)
-    assert result == "March 1"
-
-
-def test_human_date_same_year_end_of_year():
-    result = human_date(1735603200, reference=1705276800)
-    assert result == "December 31"
-
-
-def test_human_date_previous_year():
-    result = human_date(1672531200, reference=1705276800)
-    assert result == "January 1, 2023"
-
-
-def test_human_date_next_year():
-    result = human_date(1736121600, reference=1705276800)
-    assert result == "January 6, 2025"
+@pytest.mark.parametrize("stdin_text, argv", [
+    ("abc\n", ("-f", "duration")),
+    ("inf\n", ("-r", "0")),
+])
+def test_cli_error_on_wrong_type_or_overflow(monkeypatch, capsys, stdin_text, argv):
+    code, _, err = run_cli(monkeypatch, capsys, stdin_text, *argv)
+    assert code == 1
+    assert err.startswith("Error: line 1:")
 
 
 # ============================================================================
-# date_range tests
+# format_column_file tests
 # ============================================================================
 
-def test_date_range_same_day():
-    result = date_range(1705276800, 1705276800)
-    assert result == "January 15, 2024"
-
+COLUMN_REFERENCE = 1705276800
+COLUMN_TIMESTAMPS = [
+    1705276800, 1705276700, 1705190400, 1705104000, 1704067200, 1709251200,
+    1672531200, 1705363200, 1705276800, 1705190400, 1800000000, 0,
+]
+
+
+def read_column_output(prefix):
+    codes = array('H')
+    with open(f"{prefix}.codes", 'rb') as f:
+        codes.frombytes(f.read())
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    with open(f"{prefix}.labels", encoding='utf-8') as f:
+        vocabulary = f.read().splitlines()
+    return [vocabulary[c] for c in codes], vocabulary
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("function", ["timeago", "human_date"])
+def test_format_column_file(tmp_path, monkeypatch, use_numpy, function):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(whenwords, "np", None)
+    path = tmp_path / "column.i64"
+    path.write_bytes(struct.pack(f"<{len(COLUMN_TIMESTAMPS)}q", *COLUMN_TIMESTAMPS))
+
+    scalar = getattr(whenwords, function)
+    rows, labels = whenwords.format_column_file(str(path), str(tmp_path / "out"), COLUMN_REFERENCE,
+                                                function=function, chunk_rows=5)
+
+    expected = [scalar(t, COLUMN_REFERENCE) for t in COLUMN_TIMESTAMPS]
+    decoded, vocabulary = read_column_output(tmp_path / "out")
+    assert rows == len(COLUMN_TIMESTAMPS)
+    assert labels == len(set(expected)) == len(vocabulary)
+    assert decoded == expected
+
+
+def test_format_column_file_empty(tmp_path):
+    path = tmp_path / "empty.i64"
+    path.write_bytes(b"")
+    assert format_column_file(str(path), str(tmp_path / "out"), COLUMN_REFERENCE) == (0, 0)
+    assert (tmp_path / "out.codes").read_bytes() == b""
+
+
+def test_format_column_file_error_truncated(tmp_path):
+    path = tmp_path / "bad.i64"
+    path.write_bytes(b"\0" * 12)
+    with pytest.raises(ValueError):
+        format_column_file(str(path), str(tmp_path / "out"), COLUMN_REFERENCE)
 
-def test_date_range_same_day_different_times():
-    result = date_range(1705276800, 1705320000)
-    assert result == "January 15, 2024"
 
+# ============================================================================
+# dictionary-encoded batch tests
+# ============================================================================
 
-def test_date_range_consecutive_days_same_month():
-    result = date_range(1705276800, 1705363200)
-    assert result == "January 15–16, 2024"
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("function", ["timeago", "human_date"])
+def test_codes_decode_to_scalar_results(monkeypatch, use_numpy, function):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(whenwords, "np", None)
 
+    encode = getattr(whenwords, f"{function}_codes")
+    scalar = getattr(whenwords, function)
+    codes, vocabulary = encode(COLUMN_TIMESTAMPS + [1705276800.5], COLUMN_REFERENCE)
 
-def test_date_range_same_month_range():
-    result = date_range(1705276800, 1705881600)
-    assert result == "January 15–22, 2024"
+    assert isinstance(codes, array) and codes.typecode == 'H'
+    assert len(vocabulary) == len(set(vocabulary))
+    assert [vocabulary[c] for c in codes] == [scalar(t, COLUMN_REFERENCE)
+                                             for t in COLUMN_TIMESTAMPS + [1705276800.5]]
 
 
-def test_date_range_same_year_different_months():
-    result = date_range(1705276800, 1707955200)
-    assert result == "January 15 – February 15, 2024"
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batches_accept_generators(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(whenwords, "np", None)
 
+    expected = [timeago(t, COLUMN_REFERENCE) for t in COLUMN_TIMESTAMPS]
+    assert timeago_batch((t for t in COLUMN_TIMESTAMPS), COLUMN_REFERENCE) == expected
+    for function in ("timeago", "human_date"):
+        codes, vocabulary = getattr(whenwords, f"{function}_codes")(
+            iter(COLUMN_TIMESTAMPS), COLUMN_REFERENCE)
+        scalar = getattr(whenwords, function)
+        assert [vocabulary[c] for c in codes] == [scalar(t, COLUMN_REFERENCE)
+                                                 for t in COLUMN_TIMESTAMPS]
 
-def test_date_range_different_years():
-    result = date_range(1703721600, 1705276800)
-    assert result == "December 28, 2023 – January 15, 2024"
 
+def test_codes_empty():
+    codes, vocabulary = timeago_codes([], COLUMN_REFERENCE)
+    assert list(codes) == [] and vocabulary == []
 
-def test_date_range_full_year_span():
-    result = date_range(1704067200, 1735603200)
-    assert result == "January 1 – December 31, 2024"
 
+# ============================================================================
+# whenwords_parallel tests
+# ============================================================================
 
-def test_date_range_swapped_inputs_should_auto_correct():
-    result = date_range(1705881600, 1705276800)
-    assert result == "January 15–22, 2024"
+@pytest.mark.parametrize("function, columns, kwargs", [
+    ("timeago", [COLUMN_TIMESTAMPS * 10], {"reference": COLUMN_REFERENCE}),
+    ("human_date", [COLUMN_TIMESTAMPS * 10], {"reference": COLUMN_REFERENCE}),
+    ("duration", [[0, 45, 3661, 93661, 90061.5] * 10], {"options": {"compact": True}}),
+    ("parse_duration", [["2h30m", "90 minutes", "1:30:00", "2.5 hours"] * 10], {}),
+    ("date_range", [COLUMN_TIMESTAMPS * 10, list(reversed(COLUMN_TIMESTAMPS)) * 10], {}),
+])
+def test_parallel_map_matches_serial(function, columns, kwargs):
+    func = getattr(whenwords, function)
+    expected = [func(*args, **kwargs) for args in zip(*columns)]
+    assert parallel_map(function, *columns, max_workers=2, chunk_size=7, **kwargs) == expected
+
+
+def test_parallel_map_numpy_input():
+    np = pytest.importorskip("numpy")
+    ts = np.array(COLUMN_TIMESTAMPS * 10, dtype=np.int64)
+    expected = [timeago(int(t), COLUMN_REFERENCE) for t in ts]
+    assert parallel_map("timeago", ts, reference=COLUMN_REFERENCE, max_workers=2, chunk_size=9) == expected
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_parallel_map_timeago_iso_strings(max_workers):
+    timestamps = ["2024-01-01T00:00:00Z", "2023-12-31T23:58:00Z"] * 10
+    expected = [timeago(t, 1704074400) for t in timestamps]
+    assert parallel_map("timeago", timestamps, reference=1704074400,
+                        max_workers=max_workers, chunk_size=7) == expected
+    assert expected[0] == "2 hours ago"
+
+
+@pytest.mark.parametrize("container", ["numpy", "array"])
+def test_parallel_map_large_integers_stay_exact(container):
+    options = {"max_units": 6}
+    values = [2 ** 60 + 1] * 10
+    if container == "numpy":
+        column = pytest.importorskip("numpy").array(values, dtype="int64")
+    else:
+        column = array("q", values)
+    expected = duration(2 ** 60 + 1, options)
+    assert parallel_map("duration", column, options=options, max_workers=2, chunk_size=5) == [expected] * 10
+
+
+def test_parallel_map_propagates_errors():
+    with pytest.raises(ValueError):
+        parallel_map("parse_duration", ["2h"] * 20 + ["hello world"], max_workers=2, chunk_size=5)
 
 
-def test_date_range_multi_year_span():
-    result = date_range(1672531200, 1735689600)
-    assert result == "January 1, 2023 – January 1, 2025"
+def test_parallel_map_error_wrong_columns():
+    with pytest.raises(ValueError):
+        parallel_map("date_range", [1, 2])
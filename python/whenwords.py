@@ -4,13 +4,54 @@ whenwords - Human-friendly time formatting and parsing.
 All functions are pure with no side effects. Timestamps are Unix seconds.
 """
 
+import argparse
+import math
+import mmap
+import os
 import re
-from datetime import datetime, timezone
-from typing import Union, Optional
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from functools import partial
+from typing import Iterable, List, Tuple, Union, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch helpers fall back to pure Python
+    np = None
 
 # Type alias for timestamp inputs
 Timestamp = Union[int, float, str, datetime]
 
+# Statistics reported by the memoizing front-ends
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+# timeago threshold table: (upper bound in seconds, unit, divisor).
+# A bucket with a divisor of None always reports a count of 1; bucket 0 is
+# "just now". Shared by timeago_batch so it classifies exactly like timeago.
+_TIMEAGO_BUCKETS = [
+    (45, None, None),
+    (90, "minute", None),
+    (45 * 60, "minute", 60),
+    (90 * 60, "hour", None),
+    (22 * 3600, "hour", 3600),
+    (36 * 3600, "day", None),
+    (26 * 86400, "day", 86400),
+    (46 * 86400, "month", None),
+    (320 * 86400, "month", 30.4375 * 86400),
+    (548 * 86400, "year", None),
+    (math.inf, "year", 365 * 86400),
+]
+_TIMEAGO_BOUNDS = [bound for bound, _, _ in _TIMEAGO_BUCKETS[:-1]]
+
+# Differences beyond this many seconds are formatted without numpy so the
+# counts can never overflow int64 (roughly 31 million years).
+_TIMEAGO_BATCH_MAX_DIFF = 1e15
+
 
 def _normalize_timestamp(ts: Timestamp) -> float:
     """Convert various timestamp formats to Unix seconds."""
@@ -102,6 +143,19 @@ def timeago(timestamp: Timestamp, reference: Optional[Timestamp] = None) -> str:
         n = _round_half_up(diff / YEAR)
         unit = "year"
 
+    return _timeago_label(unit, n, is_future)
+
+
+def _timeago_label(unit: str, n: int, is_future: bool) -> str:
+    """Return the shared timeago string for a count of units."""
+    label = _TIMEAGO_LABELS.get((unit, n, is_future))
+    if label is None:
+        label = _format_timeago_label(unit, n, is_future)
+    return label
+
+
+def _format_timeago_label(unit: str, n: int, is_future: bool) -> str:
+    """Build the timeago string for a count of units."""
     # Pluralize
     if n != 1:
         unit += "s"
@@ -112,6 +166,115 @@ def timeago(timestamp: Timestamp, reference: Optional[Timestamp] = None) -> str:
         return f"{n} {unit} ago"
 
 
+# Interned timeago strings keyed by (unit, n, is_future), covering every count
+# the thresholds can produce below the year bucket plus the first two centuries
+# of years. Repeated calls hand out the same str object instead of a new one.
+_TIMEAGO_LABELS = {
+    (unit, n, is_future): _format_timeago_label(unit, n, is_future)
+    for unit, max_n in (("minute", 45), ("hour", 22), ("day", 26), ("month", 11), ("year", 200))
+    for n in range(1, max_n + 1)
+    for is_future in (False, True)
+}
+
+
+def timeago_batch(timestamps: Iterable[Union[int, float]], reference: Timestamp) -> List[str]:
+    """
+    Returns timeago strings for many numeric timestamps at once.
+
+    Uses numpy when it is installed: all differences are classified against
+    the threshold table with a single searchsorted call and each distinct
+    label is formatted only once. Results are identical to calling timeago
+    on every element.
+
+    Args:
+        timestamps: Sequence, numpy array, buffer or iterable of Unix seconds
+        reference: The reference time shared by every element
+
+    Returns:
+        A list of strings, one per input timestamp
+
+    Raises:
+        ValueError: If any timestamp is NaN or infinite
+    """
+    ref = _normalize_timestamp(reference)
+
+    if np is not None:
+        ts = _float_array(timestamps)
+        diff = _timeago_numpy_diff(ts, ref)
+        if diff is not None:
+            labels, inverse = _timeago_numpy_unique(diff)
+            return np.array(labels, dtype=object)[inverse].tolist()
+        ts = ts.tolist()
+    else:
+        ts = timestamps
+
+    return [_timeago_from_diff(ref - float(t)) for t in ts]
+
+
+def _float_array(values):
+    """values as a flat float64 numpy array; iterators are consumed once."""
+    if iter(values) is values:
+        return np.fromiter(values, dtype=np.float64)
+    return np.asarray(values, dtype=np.float64).ravel()
+
+
+def _timeago_from_diff(diff: float) -> str:
+    """Classify a single difference with the threshold table."""
+    if math.isnan(diff) or math.isinf(diff):
+        raise ValueError("Invalid timestamp value: NaN or infinite")
+    is_future = diff < 0
+    diff = abs(diff)
+    _, unit, divisor = _TIMEAGO_BUCKETS[bisect_right(_TIMEAGO_BOUNDS, diff)]
+    if unit is None:
+        return "just now"
+    n = 1 if divisor is None else _round_half_up(diff / divisor)
+    return _timeago_label(unit, n, is_future)
+
+
+def _timeago_numpy_diff(ts, ref: float):
+    """
+    Return reference - ts as a float64 array, or None when some difference
+    is too large for the vectorized path and the caller must fall back.
+    """
+    diff = ref - np.asarray(ts, dtype=np.float64).ravel()
+    if not np.isfinite(diff).all():
+        raise ValueError("Invalid timestamp value: NaN or infinite")
+    if diff.size and np.abs(diff).max() >= _TIMEAGO_BATCH_MAX_DIFF:
+        return None
+    return diff
+
+
+def _timeago_numpy_unique(diff):
+    """
+    Vectorized timeago over an array of (reference - timestamp) values.
+
+    Returns the distinct labels and, for every element, the index of its
+    label in that list.
+    """
+    is_future = diff < 0
+    diff = np.abs(diff)
+    bucket = np.searchsorted(_TIMEAGO_BOUNDS, diff, side='right')
+
+    divisors = np.array([d or 1.0 for _, _, d in _TIMEAGO_BUCKETS])
+    counted = np.array([d is not None for _, _, d in _TIMEAGO_BUCKETS])
+    n = np.where(counted[bucket], np.floor(diff / divisors[bucket] + 0.5), 1)
+
+    # Pack (count, bucket, direction) into one integer so every distinct
+    # label is formatted once; "just now" ignores count and direction.
+    just_now = bucket == 0
+    key = np.where(just_now, 0, n.astype(np.int64) * 32 + bucket * 2 + is_future)
+    uniq, inverse = np.unique(key, return_inverse=True)
+
+    labels = []
+    for k in uniq.tolist():
+        if k == 0:
+            labels.append("just now")
+        else:
+            unit = _TIMEAGO_BUCKETS[(k & 31) >> 1][1]
+            labels.append(_timeago_label(unit, k >> 5, bool(k & 1)))
+    return labels, inverse.ravel()
+
+
 def duration(seconds: Union[int, float], options: Optional[dict] = None) -> str:
     """
     Formats a duration (not relative to now).
@@ -128,8 +291,6 @@ def duration(seconds: Union[int, float], options: Optional[dict] = None) -> str:
     Raises:
         ValueError: If seconds is negative, NaN, or infinite
     """
-    import math
-
     if math.isnan(seconds) or math.isinf(seconds):
         raise ValueError("Invalid seconds value: NaN or infinite")
     if seconds < 0:
@@ -183,6 +344,22 @@ def duration(seconds: Union[int, float], options: Optional[dict] = None) -> str:
         return ", ".join(result_parts)
 
 
+# Unit multipliers for parse_duration
+_DURATION_UNITS = {
+    's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
+    'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+    'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
+    'd': 86400, 'day': 86400, 'days': 86400,
+    'w': 604800, 'wk': 604800, 'wks': 604800, 'week': 604800, 'weeks': 604800,
+}
+
+# Colon notation (h:mm or h:mm:ss)
+_COLON_DURATION = re.compile(r'(\d+):(\d{1,2})(?::(\d{1,2}))?')
+
+# A number followed by a unit, once commas and standalone "and"s are spaces
+_DURATION_TOKEN = re.compile(r'(\d+(?:\.\d+)?)\s*([a-z]+)')
+
+
 def parse_duration(s: str) -> int:
     """
     Parses a human-written duration string into seconds.
@@ -200,54 +377,164 @@ def parse_duration(s: str) -> int:
         raise ValueError("Empty duration string")
 
     s = s.strip()
-    original = s
 
     # Check for negative values
     if s.startswith('-'):
         raise ValueError("Negative durations are not allowed")
 
-    # Define unit multipliers
-    unit_map = {
-        's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
-        'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
-        'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
-        'd': 86400, 'day': 86400, 'days': 86400,
-        'w': 604800, 'wk': 604800, 'wks': 604800, 'week': 604800, 'weeks': 604800,
-    }
-
     # Try colon notation first (h:mm or h:mm:ss)
-    colon_match = re.match(r'^(\d+):(\d{1,2})(?::(\d{1,2}))?$', s)
+    colon_match = _COLON_DURATION.fullmatch(s)
     if colon_match:
-        hours = int(colon_match.group(1))
-        minutes = int(colon_match.group(2))
-        seconds = int(colon_match.group(3)) if colon_match.group(3) else 0
-        return hours * 3600 + minutes * 60 + seconds
+        hours, minutes, seconds = colon_match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + (int(seconds) if seconds else 0)
+
+    # One findall over number/unit pairs. The replacements are the same
+    # passes the parser has always made, so "5 and and hours" still reads
+    # "and" as a unit; whitespace needs no collapsing since \s* spans it.
+    tokens = _DURATION_TOKEN.findall(s.lower().replace(',', ' ').replace(' and ', ' '))
+    if not tokens:
+        raise ValueError(f"Cannot parse duration: {s}")
+
+    total_seconds = 0.0
+    for value_str, unit in tokens:
+        multiplier = _DURATION_UNITS.get(unit)
+        if multiplier is None:
+            raise ValueError(f"Unknown unit: {unit}")
+        total_seconds += float(value_str) * multiplier
 
-    # Normalize: lowercase, remove "and", extra spaces
-    s = s.lower()
-    s = s.replace(',', ' ').replace(' and ', ' ')
-    s = ' '.join(s.split())  # normalize whitespace
+    return int(total_seconds)
 
-    # Pattern to match number followed by unit
-    pattern = r'(\d+(?:\.\d+)?)\s*([a-z]+)'
-    matches = re.findall(pattern, s)
 
-    if not matches:
-        raise ValueError(f"Cannot parse duration: {original}")
+class _LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int):
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("Cache size must be a positive integer")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value, or _LRUCache._MISSING on a miss."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return self._MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class ParseDurationCache:
+    """
+    Memoizing front-end for parse_duration with bounded LRU eviction.
 
-    total_seconds = 0.0
-    for value_str, unit in matches:
-        value = float(value_str)
-        if value < 0:
-            raise ValueError("Negative durations are not allowed")
+    Call an instance exactly like parse_duration. Successful results are
+    cached per input string; invalid inputs are re-parsed and raise every time.
 
-        unit = unit.lower()
-        if unit not in unit_map:
-            raise ValueError(f"Unknown unit: {unit}")
+    Args:
+        maxsize: Maximum number of distinct strings kept (default 256)
+
+    Examples:
+        >>> parse = ParseDurationCache(maxsize=1024)
+        >>> parse("1h30m")
+        5400
+        >>> parse.cache_info()
+        CacheInfo(hits=0, misses=1, evictions=0, maxsize=1024, currsize=1)
+    """
 
-        total_seconds += value * unit_map[unit]
+    def __init__(self, maxsize: int = 256):
+        self._cache = _LRUCache(maxsize)
 
-    return int(total_seconds)
+    def __call__(self, s: str) -> int:
+        seconds = self._cache.get(s)
+        if seconds is _LRUCache._MISSING:
+            seconds = parse_duration(s)
+            self._cache.put(s, seconds)
+        return seconds
+
+    def cache_info(self) -> CacheInfo:
+        """Return hits, misses, evictions, maxsize and current size."""
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Drop every cached entry and reset the statistics."""
+        self._cache.clear()
+
+
+_WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+                "July", "August", "September", "October", "November", "December"]
+
+_SECONDS_PER_DAY = 86400
+
+# human_date and date_range only depend on the UTC day of each argument, so
+# their results are memoized per (day, day) pair and computed from day numbers.
+_HUMAN_DATE_CACHE = _LRUCache(4096)
+_DATE_RANGE_CACHE = _LRUCache(4096)
+
+
+# Day numbers of 0001-01-01 and 9999-12-31, the years datetime supports
+_MIN_DAY = -719162
+_MAX_DAY = 2932896
+
+
+def _utc_day(ts: float) -> int:
+    """
+    Return the number of whole UTC days since the epoch.
+
+    Raises:
+        ValueError: If the day falls outside years 1-9999
+    """
+    day = int(ts // _SECONDS_PER_DAY)
+    if not _MIN_DAY <= day <= _MAX_DAY:
+        raise ValueError(f"Timestamp out of range (years 1-9999): {ts}")
+    return day
+
+
+def _civil_from_days(days: int) -> Tuple[int, int, int, int]:
+    """
+    Convert days since 1970-01-01 to (year, month, day, weekday).
+
+    Pure integer proleptic Gregorian arithmetic (Howard Hinnant's
+    civil_from_days), so no datetime object is built. Weekday is 0 for Monday.
+    """
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (month <= 2)
+    # 1970-01-01 was a Thursday
+    return year, month, day, (days + 3) % 7
 
 
 def human_date(timestamp: Timestamp, reference: Optional[Timestamp] = None) -> str:
@@ -260,24 +547,25 @@ def human_date(timestamp: Timestamp, reference: Optional[Timestamp] = None) -> s
 
     Returns:
         A string like "Today", "Yesterday", "Last Friday", "March 15"
+
+    Raises:
+        ValueError: If either date is outside years 1-9999
     """
     ts = _normalize_timestamp(timestamp)
     ref = _normalize_timestamp(reference) if reference is not None else ts
 
-    # Convert to UTC dates
-    ts_dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-    ref_dt = datetime.fromtimestamp(ref, tz=timezone.utc)
+    key = (_utc_day(ts), _utc_day(ref))
+    result = _HUMAN_DATE_CACHE.get(key)
+    if result is _LRUCache._MISSING:
+        result = _human_date_days(*key)
+        _HUMAN_DATE_CACHE.put(key, result)
+    return result
 
-    # Get date parts (ignoring time)
-    ts_date = ts_dt.date()
-    ref_date = ref_dt.date()
 
+def _human_date_days(ts_day: int, ref_day: int) -> str:
+    """human_date for two UTC day numbers."""
     # Calculate day difference
-    day_diff = (ts_date - ref_date).days
-
-    weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    month_names = ["January", "February", "March", "April", "May", "June",
-                   "July", "August", "September", "October", "November", "December"]
+    day_diff = ts_day - ref_day
 
     if day_diff == 0:
         return "Today"
@@ -285,22 +573,21 @@ def human_date(timestamp: Timestamp, reference: Optional[Timestamp] = None) -> s
         return "Yesterday"
     elif day_diff == 1:
         return "Tomorrow"
-    elif -7 < day_diff < 0:
+
+    year, month, day, weekday = _civil_from_days(ts_day)
+
+    if -7 < day_diff < 0:
         # Within past 7 days (but not yesterday)
-        weekday = ts_dt.weekday()
-        return f"Last {weekday_names[weekday]}"
+        return f"Last {_WEEKDAY_NAMES[weekday]}"
     elif 0 < day_diff < 7:
         # Within next 7 days (but not tomorrow)
-        weekday = ts_dt.weekday()
-        return f"This {weekday_names[weekday]}"
+        return f"This {_WEEKDAY_NAMES[weekday]}"
     else:
         # Format as date
-        month = month_names[ts_dt.month - 1]
-        day = ts_dt.day
-        if ts_dt.year == ref_dt.year:
-            return f"{month} {day}"
+        if year == _civil_from_days(ref_day)[0]:
+            return f"{_MONTH_NAMES[month - 1]} {day}"
         else:
-            return f"{month} {day}, {ts_dt.year}"
+            return f"{_MONTH_NAMES[month - 1]} {day}, {year}"
 
 
 def date_range(start: Timestamp, end: Timestamp) -> str:
@@ -313,6 +600,9 @@ def date_range(start: Timestamp, end: Timestamp) -> str:
 
     Returns:
         A formatted date range string
+
+    Raises:
+        ValueError: If either date is outside years 1-9999
     """
     start_ts = _normalize_timestamp(start)
     end_ts = _normalize_timestamp(end)
@@ -321,30 +611,338 @@ def date_range(start: Timestamp, end: Timestamp) -> str:
     if start_ts > end_ts:
         start_ts, end_ts = end_ts, start_ts
 
-    # Convert to UTC dates
-    start_dt = datetime.fromtimestamp(start_ts, tz=timezone.utc)
-    end_dt = datetime.fromtimestamp(end_ts, tz=timezone.utc)
+    key = (_utc_day(start_ts), _utc_day(end_ts))
+    result = _DATE_RANGE_CACHE.get(key)
+    if result is _LRUCache._MISSING:
+        result = _date_range_days(*key)
+        _DATE_RANGE_CACHE.put(key, result)
+    return result
 
-    start_date = start_dt.date()
-    end_date = end_dt.date()
 
-    month_names = ["January", "February", "March", "April", "May", "June",
-                   "July", "August", "September", "October", "November", "December"]
+def _date_range_days(start_day: int, end_day: int) -> str:
+    """date_range for two ordered UTC day numbers."""
+    start_year, start_month, start_dom, _ = _civil_from_days(start_day)
+    end_year, end_month, end_dom, _ = _civil_from_days(end_day)
 
-    start_month = month_names[start_dt.month - 1]
-    end_month = month_names[end_dt.month - 1]
+    start_name = _MONTH_NAMES[start_month - 1]
+    end_name = _MONTH_NAMES[end_month - 1]
 
     # Same day
-    if start_date == end_date:
-        return f"{start_month} {start_dt.day}, {start_dt.year}"
+    if start_day == end_day:
+        return f"{start_name} {start_dom}, {start_year}"
 
     # Same month and year
-    if start_dt.year == end_dt.year and start_dt.month == end_dt.month:
-        return f"{start_month} {start_dt.day}\u2013{end_dt.day}, {start_dt.year}"
+    if start_year == end_year and start_month == end_month:
+        return f"{start_name} {start_dom}\u2013{end_dom}, {start_year}"
 
     # Same year, different months
-    if start_dt.year == end_dt.year:
-        return f"{start_month} {start_dt.day} \u2013 {end_month} {end_dt.day}, {start_dt.year}"
+    if start_year == end_year:
+        return f"{start_name} {start_dom} \u2013 {end_name} {end_dom}, {start_year}"
 
     # Different years
-    return f"{start_month} {start_dt.day}, {start_dt.year} \u2013 {end_month} {end_dt.day}, {end_dt.year}"
+    return f"{start_name} {start_dom}, {start_year} \u2013 {end_name} {end_dom}, {end_year}"
+
+
+# ============================================================================
+# Dictionary-encoded batch formatting
+# ============================================================================
+
+# Functions that format_column_file can apply to a column
+_COLUMN_FUNCTIONS = ("timeago", "human_date")
+
+
+class _LabelEncoder:
+    """Assigns uint16 codes to labels in first-seen order."""
+
+    def __init__(self):
+        self.codes = {}
+        self.vocabulary = []
+
+    def encode(self, label: str) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = len(self.vocabulary)
+            if code > 0xFFFF:
+                raise ValueError("More than 65536 distinct labels; cannot use uint16 codes")
+            self.codes[label] = code
+            self.vocabulary.append(label)
+        return code
+
+
+def _encode_chunk(function: str, chunk, ref: float, encoder: _LabelEncoder):
+    """
+    Encode one chunk of numeric timestamps.
+
+    Returns a numpy uint16 array when numpy is installed, otherwise an
+    array('H'). Each distinct label in the chunk is formatted only once.
+    """
+    if np is not None:
+        labels = None
+        if function == "timeago":
+            diff = _timeago_numpy_diff(chunk, ref)
+            if diff is not None:
+                labels, inverse = _timeago_numpy_unique(diff)
+        else:
+            ts = np.asarray(chunk, dtype=np.float64).ravel()
+            if not np.isfinite(ts).all():
+                raise ValueError("Invalid timestamp value: NaN or infinite")
+            if ts.size:
+                _utc_day(ts.min())
+                _utc_day(ts.max())
+            days, inverse = np.unique(np.floor_divide(ts, _SECONDS_PER_DAY), return_inverse=True)
+            ref_day = _utc_day(ref)
+            labels = [_human_date_days(int(day), ref_day) for day in days.tolist()]
+        if labels is not None:
+            table = np.array([encoder.encode(label) for label in labels], dtype=np.uint16)
+            return table[inverse.ravel()]
+
+    codes = array('H')
+    if function == "timeago":
+        for t in chunk:
+            codes.append(encoder.encode(_timeago_from_diff(ref - float(t))))
+    else:
+        ref_day = _utc_day(ref)
+        day_codes = {}
+        for t in chunk:
+            t = float(t)
+            if math.isnan(t) or math.isinf(t):
+                raise ValueError("Invalid timestamp value: NaN or infinite")
+            day = _utc_day(t)
+            code = day_codes.get(day)
+            if code is None:
+                code = day_codes[day] = encoder.encode(_human_date_days(day, ref_day))
+            codes.append(code)
+    return codes
+
+
+def _encode_batch(function: str, timestamps, reference: Timestamp,
+                  chunk_rows: int = 1 << 20) -> Tuple[array, List[str]]:
+    """Dictionary-encode an in-memory sequence of numeric timestamps."""
+    ref = _normalize_timestamp(reference)
+    encoder = _LabelEncoder()
+    if np is None:
+        return _encode_chunk(function, timestamps, ref, encoder), encoder.vocabulary
+
+    ts = _float_array(timestamps)
+    codes = array('H')
+    for start in range(0, len(ts), chunk_rows):
+        chunk_codes = _encode_chunk(function, ts[start:start + chunk_rows], ref, encoder)
+        if isinstance(chunk_codes, np.ndarray):
+            codes.frombytes(chunk_codes.astype(np.uint16, copy=False).tobytes())
+        else:
+            codes.extend(chunk_codes)
+    return codes, encoder.vocabulary
+
+
+def timeago_codes(timestamps: Iterable[Union[int, float]],
+                  reference: Timestamp) -> Tuple[array, List[str]]:
+    """
+    Dictionary-encoded timeago for many numeric timestamps.
+
+    Instead of one str per element, returns a compact uint16 code per
+    element and the small list of distinct labels, which maps directly onto
+    Arrow/Parquet dictionary columns.
+
+    Args:
+        timestamps: Sequence, numpy array, buffer or iterable of Unix seconds
+        reference: The reference time shared by every element
+
+    Returns:
+        Tuple of (codes, vocabulary) where vocabulary[codes[i]] equals
+        timeago(timestamps[i], reference)
+
+    Raises:
+        ValueError: If any timestamp is NaN or infinite, or there are more
+            than 65536 distinct labels
+    """
+    return _encode_batch("timeago", timestamps, reference)
+
+
+def human_date_codes(timestamps: Iterable[Union[int, float]],
+                     reference: Timestamp) -> Tuple[array, List[str]]:
+    """
+    Dictionary-encoded human_date for many numeric timestamps.
+
+    Args:
+        timestamps: Sequence, numpy array, buffer or iterable of Unix seconds
+        reference: The "current" date shared by every element
+
+    Returns:
+        Tuple of (codes, vocabulary) where vocabulary[codes[i]] equals
+        human_date(timestamps[i], reference)
+
+    Raises:
+        ValueError: If any timestamp is NaN, infinite or outside years
+            1-9999, or there are more than 65536 distinct labels
+    """
+    return _encode_batch("human_date", timestamps, reference)
+
+
+def _write_codes(f, codes) -> None:
+    """Append codes to f as little-endian uint16."""
+    if np is not None and isinstance(codes, np.ndarray):
+        codes.astype('<u2', copy=False).tofile(f)
+    else:
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        codes.tofile(f)
+
+
+def format_column_file(path: str, output_prefix: str, reference: Timestamp,
+                       function: str = "timeago", chunk_rows: int = 1 << 20) -> Tuple[int, int]:
+    """
+    Formats a raw binary column of int64 Unix seconds into a dictionary-encoded file pair.
+
+    The input is memory-mapped (np.memmap when numpy is installed, mmap
+    otherwise) and processed chunk_rows rows at a time, so neither the input
+    nor the output is ever held in memory as Python objects.
+
+    Args:
+        path: File of little-endian int64 timestamps with no header
+        output_prefix: Writes <prefix>.codes (little-endian uint16, one per row)
+            and <prefix>.labels (UTF-8, one label per line, line N is code N)
+        reference: The reference time shared by every row
+        function: "timeago" or "human_date"
+        chunk_rows: Rows formatted per chunk
+
+    Returns:
+        Tuple of (rows written, number of distinct labels)
+
+    Raises:
+        ValueError: If the function is unknown, the file size is not a
+            multiple of 8 bytes, or there are more than 65536 distinct labels
+    """
+    if function not in _COLUMN_FUNCTIONS:
+        raise ValueError(f"Unsupported column function: {function}")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+
+    ref = _normalize_timestamp(reference)
+    size = os.path.getsize(path)
+    if size % 8:
+        raise ValueError(f"Column file size is not a multiple of 8 bytes: {path}")
+    rows = size // 8
+    encoder = _LabelEncoder()
+
+    with open(f"{output_prefix}.codes", 'wb') as out:
+        if rows and np is not None:
+            column = np.memmap(path, dtype='<i8', mode='r')
+            for start in range(0, rows, chunk_rows):
+                _write_codes(out, _encode_chunk(function, column[start:start + chunk_rows], ref, encoder))
+            del column
+        elif rows:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as raw:
+                    for start in range(0, size, chunk_rows * 8):
+                        with raw[start:start + chunk_rows * 8] as window, window.cast('q') as chunk:
+                            if sys.byteorder == 'big':
+                                chunk = array('q', chunk)
+                                chunk.byteswap()
+                            _write_codes(out, _encode_chunk(function, chunk, ref, encoder))
+
+    with open(f"{output_prefix}.labels", 'w', encoding='utf-8', newline='\n') as out:
+        out.writelines(f"{label}\n" for label in encoder.vocabulary)
+
+    return rows, len(encoder.vocabulary)
+
+
+# ============================================================================
+# Command line
+# ============================================================================
+
+# Formatted lines are written in blocks of this many lines
+_CLI_WRITE_BATCH = 8192
+
+
+def _parse_cli_value(text: str) -> Union[int, float, str]:
+    """Interpret a CLI field as int, then float, then ISO 8601 string."""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def _format_stream(lines: Iterable[str], out, formatter, field: Optional[int]) -> None:
+    """
+    Format newline-delimited values from lines and write them to out.
+
+    With field set, lines are tab separated: the 1-based column is formatted
+    and appended to the original line as a new column. Lines formatted before
+    an invalid one are written before the error is raised.
+
+    Raises:
+        ValueError: If a line cannot be formatted, naming its line number
+    """
+    batch = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        try:
+            if field is None:
+                value = line.strip()
+                label = formatter(_parse_cli_value(value)) if value else ''
+                batch.append(f"{label}\n")
+            else:
+                columns = line.split('\t')
+                if field > len(columns):
+                    raise ValueError(f"missing column {field}")
+                value = columns[field - 1].strip()
+                label = formatter(_parse_cli_value(value)) if value else ''
+                batch.append(f"{line}\t{label}\n")
+        except (ValueError, TypeError, OverflowError) as e:
+            out.write(''.join(batch))
+            raise ValueError(f"line {lineno}: {e}") from e
+        if len(batch) >= _CLI_WRITE_BATCH:
+            out.write(''.join(batch))
+            batch.clear()
+    out.write(''.join(batch))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Stream timestamps from stdin to stdout, one formatted value per line.
+
+    Usage:
+        python -m whenwords [--function timeago|human_date|duration]
+                            [--reference TS] [--field N] [--compact] [--max-units N]
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m whenwords",
+        description="Format newline-delimited timestamps (or TSV columns) read from stdin.",
+    )
+    parser.add_argument("--function", "-f", choices=("timeago", "human_date", "duration"),
+                        default="timeago", help="function to apply (default: timeago)")
+    parser.add_argument("--reference", "-r", help="reference time as Unix seconds or ISO 8601 "
+                        "(default: the current time when the command starts)")
+    parser.add_argument("--field", "-k", type=int, help="format this 1-based tab-separated column "
+                        "and append the result as a new column")
+    parser.add_argument("--compact", action="store_true", help="duration: use compact style")
+    parser.add_argument("--max-units", type=int, default=2, help="duration: maximum units (default: 2)")
+    args = parser.parse_args(argv)
+
+    if args.field is not None and args.field < 1:
+        parser.error("--field must be 1 or greater")
+
+    try:
+        if args.function == "duration":
+            options = {'compact': args.compact, 'max_units': args.max_units}
+            formatter = partial(duration, options=options)
+        else:
+            func = timeago if args.function == "timeago" else human_date
+            reference = (_normalize_timestamp(_parse_cli_value(args.reference))
+                         if args.reference is not None else time.time())
+            formatter = partial(func, reference=reference)
+
+        _format_stream(sys.stdin, sys.stdout, formatter, args.field)
+        sys.stdout.flush()
+    except (ValueError, TypeError, OverflowError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+whenwords_parallel - Multi-core bulk formatting for whenwords.
+
+Every whenwords function is pure, so large inputs can be split into shards
+and formatted on several processes. Numeric columns are copied once into a
+shared memory block that workers read directly instead of receiving pickled
+slices; other inputs (such as parse_duration strings) are sent per shard.
+Results are reassembled in input order.
+"""
+
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Sequence
+
+import whenwords
+
+# Functions that can be mapped, and how many input columns each takes
+_FUNCTIONS = {
+    'timeago': (whenwords.timeago, 1),
+    'duration': (whenwords.duration, 1),
+    'parse_duration': (whenwords.parse_duration, 1),
+    'human_date': (whenwords.human_date, 1),
+    'date_range': (whenwords.date_range, 2),
+}
+
+# Shards smaller than this are not worth a round trip to another process
+_MIN_CHUNK_SIZE = 4096
+
+# Shards per worker when chunk_size is not given; a few per worker keeps
+# them all busy when some shards finish faster than others.
+_CHUNKS_PER_WORKER = 4
+
+_NUMERIC_TYPECODES = frozenset('bBhHiIlLqQfd')
+
+
+def _is_numeric_column(column: Sequence[Any]) -> bool:
+    """True if every value can travel through shared memory as a float64."""
+    np = whenwords.np
+    if np is not None and isinstance(column, np.ndarray):
+        if column.dtype.kind == 'f':
+            return True
+        if column.dtype.kind not in 'iu':
+            return False
+        return column.size == 0 or (int(column.min()) > -2 ** 53 and int(column.max()) < 2 ** 53)
+    if isinstance(column, array):
+        if column.typecode not in _NUMERIC_TYPECODES:
+            return False
+        # Floats and integers of up to 32 bits are exact as float64
+        if column.typecode in 'fd' or column.itemsize <= 4:
+            return True
+    return all(type(v) in (int, float) and abs(v) < 2 ** 53 for v in column)
+
+
+def _format_values(name: str, columns: Sequence[Sequence[Any]], kwargs: dict) -> List[Any]:
+    """Apply a whenwords function to aligned columns."""
+    if (name == 'timeago' and kwargs.get('reference') is not None
+            and _is_numeric_column(columns[0])):
+        return whenwords.timeago_batch(columns[0], kwargs['reference'])
+    func = _FUNCTIONS[name][0]
+    return [func(*args, **kwargs) for args in zip(*columns)]
+
+
+def _format_shared_shard(name: str, shm_name: str, length: int, n_columns: int,
+                         start: int, stop: int, kwargs: dict) -> List[Any]:
+    """Worker entry point: format rows start:stop of a shared float64 block."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        with shm.buf.cast('d') as view:
+            columns = [array('d', view[i * length + start:i * length + stop])
+                       for i in range(n_columns)]
+        return _format_values(name, columns, kwargs)
+    finally:
+        shm.close()
+
+
+def _format_pickled_shard(name: str, columns: Sequence[Sequence[Any]], kwargs: dict) -> List[Any]:
+    """Worker entry point: format a shard sent as ordinary arguments."""
+    return _format_values(name, columns, kwargs)
+
+
+def parallel_map(function: str, *columns: Sequence[Any], max_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None, **kwargs) -> List[Any]:
+    """
+    Applies a whenwords function to every row of one or two columns using a process pool.
+
+    Args:
+        function: "timeago", "duration", "parse_duration", "human_date" or "date_range"
+        *columns: Input sequences (starts and ends for date_range), all the same length
+        max_workers: Worker processes (defaults to the number of CPUs)
+        chunk_size: Rows per shard (defaults to a few shards per worker)
+        **kwargs: Passed to the function, e.g. reference=... or options={...}
+
+    Returns:
+        A list of results in input order
+
+    Raises:
+        ValueError: If the function is unknown, the columns are the wrong
+            number or length, or any row is invalid for the function
+
+    Examples:
+        >>> parallel_map("timeago", [1704067110, 1704070200], reference=1704067200)
+        ['2 minutes ago', 'in 1 hour']
+    """
+    if function not in _FUNCTIONS:
+        raise ValueError(f"Unknown function: {function}")
+    n_columns = _FUNCTIONS[function][1]
+    if len(columns) != n_columns:
+        raise ValueError(f"{function} takes {n_columns} column(s), got {len(columns)}")
+    length = len(columns[0])
+    if any(len(column) != length for column in columns):
+        raise ValueError("All columns must have the same length")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(_MIN_CHUNK_SIZE, math.ceil(length / (max_workers * _CHUNKS_PER_WORKER)))
+    elif chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    if max_workers == 1 or length <= chunk_size:
+        return _format_values(function, columns, kwargs)
+
+    bounds = [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+    results = []
+
+    if all(_is_numeric_column(column) for column in columns):
+        shm = shared_memory.SharedMemory(create=True, size=8 * length * n_columns)
+        try:
+            np = whenwords.np
+            with shm.buf.cast('d') as view:
+                for i, column in enumerate(columns):
+                    if np is not None and isinstance(column, np.ndarray):
+                        np.frombuffer(view, dtype=np.float64, count=length,
+                                      offset=8 * i * length)[:] = column.ravel()
+                    else:
+                        view[i * length:(i + 1) * length] = array('d', column)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_format_shared_shard, function, shm.name, length,
+                                           n_columns, start, stop, kwargs)
+                           for start, stop in bounds]
+                for future in futures:
+                    results.extend(future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_format_pickled_shard, function,
+                                       [column[start:stop] for column in columns], kwargs)
+                       for start, stop in bounds]
+            for future in futures:
+                results.extend(future.result())
+
+    return results
@@ -0,0 +1,119 @@
+"""
+Shared loader for the whenwords specification test corpus.
+
+nodejs/tests.yaml is the single source of truth for the expected behaviour
+of every implementation. Parsing YAML is slow compared to running the
+cases, so the parsed corpus is cached as a marshal fixture in a
+__pycache__ directory next to the YAML file, keyed by the file's SHA-256:
+editing tests.yaml invalidates the fixture automatically, and PyYAML is
+only needed when the fixture is missing or stale.
+
+Usage:
+    import spec_corpus
+
+    for case in spec_corpus.cases("timeago"):
+        assert timeago(*case.args) == case.output
+"""
+
+import hashlib
+import marshal
+import os
+import sys
+from collections import namedtuple
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nodejs', 'tests.yaml')
+
+FUNCTIONS = ('timeago', 'duration', 'parse_duration', 'human_date', 'date_range')
+
+# Argument names of each function in call order, as tests.yaml names them;
+# parse_duration takes its input string directly
+ARGUMENTS = {
+    'timeago': ('timestamp', 'reference'),
+    'duration': ('seconds', 'options'),
+    'human_date': ('timestamp', 'reference'),
+    'date_range': ('start', 'end'),
+}
+
+# Bump whenever the fixture layout changes
+FIXTURE_VERSION = 1
+
+Case = namedtuple('Case', ['function', 'name', 'args', 'output', 'error'])
+
+# Parsed corpora already loaded by this process, keyed by YAML path
+_loaded = {}
+
+
+def fixture_path(path=SPEC_PATH):
+    """Path of the cached fixture for a YAML corpus."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, '__pycache__', f"{name}.{sys.implementation.cache_tag}.marshal")
+
+
+def load_spec(path=SPEC_PATH):
+    """
+    Return the parsed corpus, from the fixture when it matches the YAML file.
+
+    Returns:
+        The YAML document as plain dicts and lists
+
+    Raises:
+        ImportError: If the fixture is missing or stale and PyYAML is not
+            installed
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    entry = _loaded.get(path)
+    if entry is not None and entry['digest'] == digest:
+        return entry['spec']
+
+    fixture = fixture_path(path)
+    try:
+        with open(fixture, 'rb') as f:
+            entry = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        entry = None
+    if (not isinstance(entry, dict) or entry.get('version') != FIXTURE_VERSION
+            or entry.get('digest') != digest):
+        import yaml
+        entry = {'version': FIXTURE_VERSION, 'digest': digest,
+                 'spec': yaml.safe_load(source.decode('utf-8'))}
+        _save_fixture(fixture, entry)
+    _loaded[path] = entry
+    return entry['spec']
+
+
+def _save_fixture(fixture, entry):
+    """Write a fixture atomically; failures only cost a reparse next time."""
+    try:
+        os.makedirs(os.path.dirname(fixture), exist_ok=True)
+        tmp = f"{fixture}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(tmp, fixture)
+    except OSError:
+        pass
+
+
+def cases(function=None, path=SPEC_PATH):
+    """
+    Test cases for one function, or for all of them in FUNCTIONS order.
+
+    Each Case holds positional args for the function, the expected output
+    (None for error cases) and whether the call must raise ValueError.
+
+    Raises:
+        ImportError: As for load_spec()
+    """
+    spec = load_spec(path)
+    result = []
+    for name in (function,) if function else FUNCTIONS:
+        for case in spec[name]:
+            data = case['input']
+            if isinstance(data, dict):
+                args = tuple(data[arg] for arg in ARGUMENTS[name] if arg in data)
+            else:
+                args = (data,)
+            error = bool(case.get('error'))
+            result.append(Case(name, case['name'], args, None if error else case['output'], error))
+    return result